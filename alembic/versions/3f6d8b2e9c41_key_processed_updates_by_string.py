@@ -0,0 +1,33 @@
+"""Key processed_updates by string
+
+Revision ID: 3f6d8b2e9c41
+Revises: 0b202cf117d6
+Create Date: 2026-10-18 20:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6d8b2e9c41'
+down_revision = '0b202cf117d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # chat messages all had update_id 0, the stored ids cannot be trusted
+    op.execute('DELETE FROM processed_updates')
+    op.drop_constraint('processed_updates_update_id_key', 'processed_updates', type_='unique')
+    op.alter_column('processed_updates', 'update_id', new_column_name='update_key',
+                    type_=sa.String(), postgresql_using='update_id::text')
+    op.create_unique_constraint(op.f('processed_updates_update_key_key'), 'processed_updates', ['update_key'])
+
+
+def downgrade() -> None:
+    op.execute('DELETE FROM processed_updates')
+    op.drop_constraint('processed_updates_update_key_key', 'processed_updates', type_='unique')
+    op.alter_column('processed_updates', 'update_key', new_column_name='update_id',
+                    type_=sa.BigInteger(), postgresql_using='update_key::bigint')
+    op.create_unique_constraint(op.f('processed_updates_update_id_key'), 'processed_updates', ['update_id'])
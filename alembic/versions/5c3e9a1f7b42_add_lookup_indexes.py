@@ -0,0 +1,37 @@
+"""Add lookup indexes
+
+Revision ID: 5c3e9a1f7b42
+Revises: a18c273d0700
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c3e9a1f7b42'
+down_revision = 'a18c273d0700'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_questions_theme_id'), 'questions', ['theme_id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index(op.f('ix_answers_question_id'), 'answers', ['question_id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index(op.f('ix_admins_email'), 'admins', ['email'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_admins_email'), table_name='admins',
+                      postgresql_concurrently=True)
+        op.drop_index(op.f('ix_answers_question_id'), table_name='answers',
+                      postgresql_concurrently=True)
+        op.drop_index(op.f('ix_questions_theme_id'), table_name='questions',
+                      postgresql_concurrently=True)
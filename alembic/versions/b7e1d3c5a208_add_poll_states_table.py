@@ -0,0 +1,30 @@
+"""Add poll_states table
+
+Revision ID: b7e1d3c5a208
+Revises: 8d2f4b6a1c90
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e1d3c5a208'
+down_revision = '8d2f4b6a1c90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('poll_states',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('group_id', sa.BigInteger(), nullable=False),
+    sa.Column('ts', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('group_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('poll_states')
@@ -0,0 +1,32 @@
+"""Add processed_updates table
+
+Revision ID: e4a9c2f6b713
+Revises: b7e1d3c5a208
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a9c2f6b713'
+down_revision = 'b7e1d3c5a208'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('processed_updates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('update_id', sa.BigInteger(), nullable=False),
+    sa.Column('processed_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('update_id')
+    )
+    op.create_index(op.f('ix_processed_updates_processed_at'), 'processed_updates', ['processed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_processed_updates_processed_at'), table_name='processed_updates')
+    op.drop_table('processed_updates')
@@ -1,6 +1,5 @@
 from dataclasses import dataclass
-from hashlib import sha256
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
 from sqlalchemy import (
     CHAR,
@@ -27,8 +26,10 @@ class Admin:
     email: str
     password: Optional[str] = None
 
-    def is_password_valid(self, password: str):
-        return self.password == sha256(password.encode()).hexdigest()
+    async def is_password_valid(
+        self, password: str, verify: Callable[[str, Optional[str]], Awaitable[bool]]
+    ) -> bool:
+        return await verify(password, self.password)
 
     @classmethod
     def from_session(cls, session: Optional[dict]) -> Optional["Admin"]:
@@ -39,5 +40,14 @@ class AdminModel(db):
     __tablename__ = "admins"
 
     id = Column('id', Integer, primary_key=True)
-    email = Column('email', String)
+    email = Column('email', String, index=True)
     password = Column('password', String)
+
+
+class SessionModel(db):
+    __tablename__ = "sessions"
+
+    id = Column(Integer, primary_key=True)
+    key = Column(String, nullable=False, unique=True)
+    data = Column(Text, nullable=False)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
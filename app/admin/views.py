@@ -1,10 +1,10 @@
-import aiohttp_session
-from aiohttp.web import HTTPForbidden, HTTPUnauthorized
+from aiohttp.web import HTTPForbidden
 from aiohttp_apispec import request_schema, response_schema
-from aiohttp_session import new_session, get_session
+from aiohttp_session import new_session
 
 from app.admin.schemes import AdminSchema
 from app.web.app import View
+from app.web.mixins import AuthRequiredMixin
 from app.web.utils import json_response
 
 
@@ -14,21 +14,35 @@ class AdminLoginView(View):
     async def post(self):
         data = self.data
         if admin := await self.store.admins.get_by_email(data['email']):
-            if admin.is_password_valid(data['password']):
+            if await self.store.admins.verify_password(admin, data['password']):
                 session = await new_session(request=self.request)
                 session['admin'] = dict()
                 session['admin']['id'] = admin.id
                 session['admin']['email'] = admin.email
+                self.store.admins.remember_identity(admin)
 
                 return json_response(data={'id': admin.id, 'email': admin.email})
         raise HTTPForbidden
 
 
-class AdminCurrentView(View):
+class AdminCurrentView(AuthRequiredMixin, View):
     @response_schema(AdminSchema, 200)
     async def get(self):
-        if session := await get_session(self.request):
-            admin = self.store.admins.get_by_email(session['admin']['email'])
-            return json_response(data={'id': admin.id, 'email': admin.email})
-        else:
-            raise HTTPUnauthorized
+        await super()._check_user_authorization()
+        await super()._check_correct_user_email()
+
+        admin = self.request['admin_identity']
+        return json_response(data={'id': admin.id, 'email': admin.email})
+
+
+class AdminMetricsView(AuthRequiredMixin, View):
+    async def get(self):
+        await super()._check_user_authorization()
+        await super()._check_correct_user_email()
+
+        return json_response(data={
+            'quiz_cache': self.store.quizzes.cache_stats(),
+            'outbound_queue': self.store.bots_manager.outbound.stats(),
+            'dedup': self.store.bots_manager.dedup.stats(),
+            'poller': self.store.vk_api.poller.stats() if self.store.vk_api.poller else None,
+        })
@@ -0,0 +1,13 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # listed in requirements.txt; stdlib json still works without it
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
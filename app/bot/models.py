@@ -0,0 +1,28 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Integer,
+    String,
+    TIMESTAMP,
+    func,
+)
+
+from app.store.database.sqlalchemy_base import db
+
+
+class PollStateModel(db):
+    __tablename__ = "poll_states"
+
+    id = Column(Integer, primary_key=True)
+    group_id = Column(BigInteger, nullable=False, unique=True)
+    ts = Column(String, nullable=False)
+
+
+class ProcessedUpdateModel(db):
+    __tablename__ = "processed_updates"
+
+    id = Column(Integer, primary_key=True)
+    update_key = Column(String, nullable=False, unique=True)
+    processed_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), index=True
+    )
@@ -0,0 +1,42 @@
+import hmac
+import json
+
+from aiohttp.web import HTTPBadRequest, HTTPForbidden, HTTPNotFound, Response
+
+from app.base.serialization import loads
+from app.store.vk_api.dataclasses import parse_update
+from app.web.app import View
+
+
+class VkCallbackView(View):
+    async def post(self):
+        config = self.request.app.config.bot
+        if config.mode != "callback":
+            raise HTTPNotFound
+
+        try:
+            event = await self.request.json(loads=loads)
+            event_type = event["type"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            raise HTTPBadRequest
+
+        if event.get("group_id") != config.group_id:
+            raise HTTPForbidden
+        if event_type == "confirmation":
+            return Response(text=config.confirmation_code)
+        if config.secret and not hmac.compare_digest(
+            str(event.get("secret", "")), config.secret
+        ):
+            raise HTTPForbidden
+
+        # VK retries an event until it gets a quick "ok": handling goes on
+        # in the background and duplicates are dropped by the bot manager
+        if event_type == "message_new":
+            try:
+                update = parse_update(event)
+            except (KeyError, TypeError):
+                # a retry would fail the same way
+                self.request.app.logger.warning("malformed event: %s", event)
+            else:
+                self.store.bots_manager.submit([update])
+        return Response(text="ok")
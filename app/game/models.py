@@ -0,0 +1,36 @@
+from sqlalchemy import (
+    ARRAY,
+    BigInteger,
+    Boolean,
+    Column,
+    ForeignKey,
+    Integer,
+    TIMESTAMP,
+    UniqueConstraint,
+    func,
+)
+
+from app.store.database.sqlalchemy_base import db
+
+
+class GameModel(db):
+    __tablename__ = "games"
+
+    id = Column(Integer, primary_key=True)
+    peer_id = Column(BigInteger, nullable=False, index=True)
+    theme_id = Column(Integer, ForeignKey('themes.id', ondelete='SET NULL'), nullable=True, index=True)
+    question_id = Column(Integer, ForeignKey('questions.id', ondelete='SET NULL'), nullable=True, index=True)
+    asked_question_ids = Column(ARRAY(Integer), nullable=False, server_default='{}')
+    is_active = Column(Boolean, nullable=False, server_default='true')
+    started_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+    finished_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+
+class GameScoreModel(db):
+    __tablename__ = "game_scores"
+    __table_args__ = (UniqueConstraint('game_id', 'user_id'),)
+
+    id = Column(Integer, primary_key=True)
+    game_id = Column(Integer, ForeignKey('games.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(BigInteger, nullable=False)
+    points = Column(Integer, nullable=False, server_default='0')
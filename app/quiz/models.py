@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from sqlalchemy import (
     CHAR,
@@ -21,26 +21,39 @@ from sqlalchemy.orm import relationship
 from app.store.database.sqlalchemy_base import db
 
 
-@dataclass
+@dataclass(frozen=True)
 class Theme:
     id: int
     title: str
 
 
-@dataclass
+@dataclass(frozen=True)
 class Question:
     id: int
     title: str
     theme_id: int
     answers: list["Answer"]
 
+    def copy(self) -> "Question":
+        """A copy that does not share the answers list; cached questions
+        are handed out this way."""
+        return replace(self, answers=list(self.answers))
 
-@dataclass
+
+@dataclass(frozen=True)
 class Answer:
     title: str
     is_correct: bool
 
 
+@dataclass(frozen=True)
+class RejectedQuestion:
+    """Why a question of a bulk insert was not created."""
+    code: str  # SQLSTATE of the violation
+    field: str
+    message: str
+
+
 class ThemeModel(db):
     __tablename__ = "themes"
 
@@ -53,8 +66,8 @@ class QuestionModel(db):
 
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False, unique=True)
-    theme_id = Column(Integer, ForeignKey('themes.id', ondelete='CASCADE'), nullable=False)
-    answers = relationship('AnswerModel', backref='question_model')
+    theme_id = Column(Integer, ForeignKey('themes.id', ondelete='CASCADE'), nullable=False, index=True)
+    answers = relationship('AnswerModel', backref='question_model', order_by='AnswerModel.id')
 
 
 class AnswerModel(db):
@@ -63,4 +76,4 @@ class AnswerModel(db):
     id = Column(Integer, primary_key=True)
     title = Column(String, unique=True, nullable=False)
     is_correct = Column(Boolean, nullable=False)
-    question_id = Column(Integer, ForeignKey('questions.id', ondelete='CASCADE'), nullable=False)
+    question_id = Column(Integer, ForeignKey('questions.id', ondelete='CASCADE'), nullable=False, index=True)
@@ -2,7 +2,9 @@ import typing
 
 from app.quiz.views import (
     QuestionAddView,
+    QuestionImportView,
     QuestionListView,
+    QuizExportView,
     ThemeAddView,
     ThemeListView,
 )
@@ -16,3 +18,5 @@ def setup_routes(app: "Application"):
     app.router.add_view("/quiz.list_themes", ThemeListView)
     app.router.add_view("/quiz.add_question", QuestionAddView)
     app.router.add_view("/quiz.list_questions", QuestionListView)
+    app.router.add_view("/quiz.export", QuizExportView)
+    app.router.add_view("/quiz.import_questions", QuestionImportView)
@@ -1,5 +1,7 @@
 from marshmallow import Schema, fields
 
+from app.web.schemes import PaginationSchema
+
 
 class ThemeSchema(Schema):
     id = fields.Int(required=False)
@@ -20,11 +22,27 @@ class AnswerSchema(Schema):
 
 class ThemeListSchema(Schema):
     themes = fields.Nested(ThemeSchema, many=True)
+    next_cursor = fields.Str(allow_none=True)
 
 
-class ThemeIdSchema(Schema):
+class ThemeIdSchema(PaginationSchema):
     theme_id = fields.Int()
 
 
 class ListQuestionSchema(Schema):
     questions = fields.Nested(QuestionSchema, many=True)
+    next_cursor = fields.Str(allow_none=True)
+
+
+class ImportRowSchema(Schema):
+    index = fields.Int()
+    status = fields.Str()
+    id = fields.Int()
+    errors = fields.Dict()
+
+
+class ImportReportSchema(Schema):
+    created = fields.Int()
+    duplicate = fields.Int()
+    invalid = fields.Int()
+    rows = fields.Nested(ImportRowSchema, many=True)
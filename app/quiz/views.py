@@ -1,18 +1,27 @@
-from aiohttp.web_exceptions import HTTPConflict, HTTPUnauthorized, HTTPForbidden, HTTPBadRequest, HTTPNotFound
+import json
+from contextlib import aclosing
+from typing import AsyncIterator
+
+from aiohttp.web import StreamResponse
+from aiohttp.web_exceptions import HTTPConflict, HTTPForbidden, HTTPBadRequest, HTTPNotFound
 from aiohttp_apispec import querystring_schema, request_schema, response_schema
-from aiohttp_session import get_session
+from marshmallow import ValidationError
+from sqlalchemy.exc import IntegrityError
 
-from app.quiz.models import Answer
+from app.quiz.models import Answer, Question, RejectedQuestion, Theme
 from app.quiz.schemes import (
+    ImportReportSchema,
     ListQuestionSchema,
     QuestionSchema,
     ThemeIdSchema,
     ThemeListSchema,
     ThemeSchema,
 )
+from app.store.quiz.accessor import FOREIGN_KEY_VIOLATION, IMPORT_BATCH_SIZE, UNIQUE_VIOLATION
 from app.web.app import View
 from app.web.mixins import AuthRequiredMixin
-from app.web.utils import json_response
+from app.web.schemes import PaginationSchema
+from app.web.utils import json_response, paginate
 
 
 class ThemeAddView(AuthRequiredMixin, View):
@@ -22,24 +31,31 @@ class ThemeAddView(AuthRequiredMixin, View):
         await super()._check_user_authorization()
         await super()._check_correct_user_email()
 
-        title = self.data['title']
-        theme = await self.store.quizzes.get_theme_by_title(title)
-
-        if theme:
+        theme = await self.store.quizzes.create_theme_if_not_exists(title=self.data['title'])
+        if theme is None:
             raise HTTPConflict
-        else:
-            theme = await self.store.quizzes.create_theme(title=title)
-            return json_response(data=ThemeSchema().dump(theme))
+        return json_response(data=ThemeSchema().dump(theme))
 
 
 class ThemeListView(AuthRequiredMixin, View):
+    @querystring_schema(PaginationSchema)
     @response_schema(ThemeListSchema)
     async def get(self):
         await super()._check_user_authorization()
         await super()._check_correct_user_email()
 
-        themes = await self.store.quizzes.list_themes()
-        return json_response(data={'themes': [ThemeSchema().dump(theme) for theme in themes]})
+        query = self.request.get('querystring', {})
+        limit = query.get('limit')
+        themes = await self.store.quizzes.list_themes(
+            limit=limit + 1 if limit else None,
+            after_id=query.get('cursor'),
+        )
+        themes, next_cursor = paginate(themes, limit)
+
+        data = {'themes': [ThemeSchema().dump(theme) for theme in themes]}
+        if limit:
+            data['next_cursor'] = next_cursor
+        return json_response(data=data)
 
 
 class QuestionAddView(AuthRequiredMixin, View):
@@ -73,17 +89,18 @@ class QuestionAddView(AuthRequiredMixin, View):
         if not await self._answers_are_correct(answers):
             raise HTTPBadRequest
 
-        if not await self.store.quizzes.get_theme_by_id(theme_id):
-            raise HTTPNotFound
-
-        if await self.store.quizzes.get_question_by_title(title):
-            raise HTTPConflict
-
-        question = await self.store.quizzes.create_question(title, theme_id, [
-            Answer(title=answer['title'],
-                   is_correct=answer['is_correct']
-                   )
-            for answer in answers])
+        try:
+            question = await self.store.quizzes.create_question(title, theme_id, [
+                Answer(title=answer['title'],
+                       is_correct=answer['is_correct']
+                       )
+                for answer in answers])
+        except IntegrityError as e:
+            if e.orig.pgcode == UNIQUE_VIOLATION:
+                raise HTTPConflict
+            if e.orig.pgcode == FOREIGN_KEY_VIOLATION:
+                raise HTTPNotFound
+            raise
 
         return json_response(data=({'id': question.id} | self.data))
 
@@ -95,7 +112,153 @@ class QuestionListView(AuthRequiredMixin, View):
         await super()._check_user_authorization()
         await super()._check_correct_user_email()
 
-        theme_id = self.request.query.get('theme_id')
-        questions = await self.store.quizzes.list_questions(theme_id)
+        query = self.request.get('querystring', {})
+        limit = query.get('limit')
+        questions = await self.store.quizzes.list_questions(
+            theme_id=query.get('theme_id'),
+            limit=limit + 1 if limit else None,
+            after_id=query.get('cursor'),
+        )
+        questions, next_cursor = paginate(questions, limit)
+
+        data = {'questions': [QuestionSchema().dump(question) for question in questions]}
+        if limit:
+            data['next_cursor'] = next_cursor
+        return json_response(data=data)
+
+
+class QuizExportView(AuthRequiredMixin, View):
+    async def get(self):
+        await super()._check_user_authorization()
+        await super()._check_correct_user_email()
+
+        theme_schema, question_schema = ThemeSchema(), QuestionSchema()
+
+        def encode(items: list[Theme | Question]) -> bytes:
+            return ''.join(
+                json.dumps(
+                    {'type': 'theme', 'data': theme_schema.dump(item)}
+                    if isinstance(item, Theme)
+                    else {'type': 'question', 'data': question_schema.dump(item)}
+                ) + '\n'
+                for item in items
+            ).encode()
+
+        async with aclosing(self.store.quizzes.export_catalog()) as catalog:
+            # the first page is read before the headers go out, so a failing
+            # query still gets a regular error response
+            first = await anext(catalog, [])
+            response = StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+            await response.prepare(self.request)
+            try:
+                await response.write(encode(first))
+                async for items in catalog:
+                    await response.write(encode(items))
+            except ConnectionResetError:
+                raise
+            except Exception as e:
+                # the status is already sent: end with an error record so
+                # the client can tell the export is truncated
+                self.request.app.logger.error("Exception", exc_info=e)
+                await response.write((json.dumps({'type': 'error', 'message': str(e)}) + '\n').encode())
+
+        await response.write_eof()
+        return response
+
+
+class QuestionImportView(AuthRequiredMixin, View):
+    async def _iter_rows(self) -> AsyncIterator:
+        """NDJSON is read from the stream line by line and is not limited by
+        the app's client_max_size, a JSON array has to fit into it."""
+        if self.request.content_type == 'application/x-ndjson':
+            index = 0
+            async for line in self.request.content:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield index, row
+                index += 1
+            return
+
+        try:
+            rows = json.loads(await self.request.text())
+        except ValueError:
+            raise HTTPBadRequest(reason='body is not valid JSON')
+        if not isinstance(rows, list):
+            raise HTTPBadRequest(reason='body must be a JSON array')
+        for index, row in enumerate(rows):
+            yield index, row
+
+    async def _import_chunk(self, questions: dict[int, Question], report: dict) -> None:
+        theme_ids = await self.store.quizzes.get_existing_theme_ids(
+            {question.theme_id for question in questions.values()}
+        )
+        for index, question in list(questions.items()):
+            if question.theme_id not in theme_ids:
+                report[index] = {'index': index, 'status': 'invalid', 'errors': {'theme_id': ['Theme not found.']}}
+                del questions[index]
+
+        created = await self.store.quizzes.create_questions(list(questions.values()))
+        for index, question in zip(questions, created):
+            if isinstance(question, RejectedQuestion):
+                report[index] = self._rejected_row(index, question)
+            else:
+                report[index] = {'index': index, 'status': 'created', 'id': question.id}
+
+    @staticmethod
+    def _rejected_row(index: int, rejected: RejectedQuestion) -> dict:
+        # same mapping as QuestionAddView: a duplicate title is a conflict,
+        # anything else is an invalid row
+        if rejected.code == UNIQUE_VIOLATION and rejected.field == 'title':
+            return {'index': index, 'status': 'duplicate'}
+        if rejected.code == FOREIGN_KEY_VIOLATION:
+            return {'index': index, 'status': 'invalid', 'errors': {'theme_id': ['Theme not found.']}}
+        return {'index': index, 'status': 'invalid', 'errors': {rejected.field: [rejected.message]}}
+
+    @response_schema(ImportReportSchema)
+    async def post(self):
+        await super()._check_user_authorization()
+        await super()._check_correct_user_email()
+
+        report = {}
+        questions = {}
+        schema = QuestionSchema()
+        async for index, row in self._iter_rows():
+            try:
+                data = schema.load(row if isinstance(row, dict) else {})
+            except ValidationError as e:
+                report[index] = {'index': index, 'status': 'invalid', 'errors': e.messages}
+                continue
+            if not await QuestionAddView._answers_are_correct(data['answers']):
+                report[index] = {
+                    'index': index,
+                    'status': 'invalid',
+                    'errors': {'answers': ['Exactly one answer out of several must be correct.']},
+                }
+                continue
+            questions[index] = Question(
+                id=None,
+                title=data['title'],
+                theme_id=data['theme_id'],
+                answers=[
+                    Answer(title=answer['title'], is_correct=answer['is_correct'])
+                    for answer in data['answers']
+                ],
+            )
+            if len(questions) >= IMPORT_BATCH_SIZE:
+                await self._import_chunk(questions, report)
+                questions = {}
+
+        if questions:
+            await self._import_chunk(questions, report)
 
-        return json_response(data={'questions': [QuestionSchema().dump(question) for question in questions]})
+        rows = [report[index] for index in sorted(report)]
+        return json_response(data={
+            'created': sum(row['status'] == 'created' for row in rows),
+            'duplicate': sum(row['status'] == 'duplicate' for row in rows),
+            'invalid': sum(row['status'] == 'invalid' for row in rows),
+            'rows': rows,
+        })
@@ -9,14 +9,26 @@ if typing.TYPE_CHECKING:
 class Store:
     def __init__(self, app: "Application"):
         from app.store.bot.manager import BotManager
+        from app.store.game.engine import GameEngine
         from app.store.admin.accessor import AdminAccessor
         from app.store.quiz.accessor import QuizAccessor
+        from app.store.session.accessor import (
+            MemorySessionAccessor,
+            PostgresSessionAccessor,
+        )
         from app.store.vk_api.accessor import VkApiAccessor
 
         self.quizzes = QuizAccessor(app)
         self.admins = AdminAccessor(app)
+        if app.config.session.storage == "postgres":
+            self.sessions = PostgresSessionAccessor(app)
+        else:
+            self.sessions = MemorySessionAccessor(app)
         self.vk_api = VkApiAccessor(app)
         self.bots_manager = BotManager(app)
+        self.games = GameEngine(app)
+        # after every accessor's connect, e.g. games are loaded by then
+        app.on_startup.append(self.vk_api.start_polling)
 
 
 def setup_store(app: "Application"):
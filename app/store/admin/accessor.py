@@ -1,38 +1,76 @@
 import typing
-from hashlib import sha256
 from pprint import pprint
 
-from sqlalchemy import select, insert
+from sqlalchemy import select, insert, update
 from sqlalchemy.engine import ChunkedIteratorResult
 
 from app.admin.models import Admin, AdminModel
 from app.base.base_accessor import BaseAccessor
+from app.base.cache import TTLCache
+from app.store.admin.hasher import PasswordHasher
 
 if typing.TYPE_CHECKING:
     from app.web.app import Application
 
 
 class AdminAccessor(BaseAccessor):
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        config = app.config.cache
+        self.identities = TTLCache(max_size=config.max_size, ttl=config.admin_ttl)
+        self.hasher = PasswordHasher(app.config.password)
+
     async def connect(self, app: "Application"):
         if not await self.get_by_email(app.config.admin.email):
             await self.create_admin(app.config.admin.email,
                                     app.config.admin.password)
 
+    async def disconnect(self, app: "Application"):
+        self.hasher.close()
+
     async def get_by_email(self, email: str) -> Admin | None:
         query_get_by_email = select(AdminModel).where(AdminModel.email == email)
-        async with self.app.database.session() as session:
+        async with self.app.database.transaction() as session:
             res = await session.scalars(query_get_by_email)
             wrapped_data = res.first()
-            if wrapped_data:
-                return Admin(id=wrapped_data.id, email=wrapped_data.email, password=wrapped_data.password)
+        if wrapped_data:
+            return Admin(id=wrapped_data.id, email=wrapped_data.email, password=wrapped_data.password)
 
     async def create_admin(self, email: str, password: str) -> Admin:
         admin = AdminModel(
             email=email,
-            password=sha256(password.encode()).hexdigest()
+            password=await self.hasher.hash(password)
         )
-        async with self.app.database.session() as session:
+        async with self.app.database.transaction() as session:
             session.add(admin)
-            await session.commit()
-            await session.refresh(admin)
+            await session.flush()
+            self.app.database.after_commit(lambda: self.invalidate_identity(email))
         return Admin(id=admin.id, email=admin.email, password=admin.password)
+
+    async def verify_password(self, admin: Admin, password: str) -> bool:
+        if not await admin.is_password_valid(password, self.hasher.verify):
+            return False
+
+        if self.hasher.needs_rehash(admin.password):
+            admin.password = await self.hasher.hash(password)
+            async with self.app.database.transaction() as session:
+                await session.execute(
+                    update(AdminModel).where(AdminModel.id == admin.id).values(password=admin.password)
+                )
+        return True
+
+    async def get_identity(self, email: str) -> Admin | None:
+        if (identity := self.identities.get(email)) is not None:
+            return identity
+
+        admin = await self.get_by_email(email)
+        if admin is not None:
+            return self.remember_identity(admin)
+
+    def remember_identity(self, admin: Admin) -> Admin:
+        identity = Admin(id=admin.id, email=admin.email)
+        self.identities.set(admin.email, identity)
+        return identity
+
+    def invalidate_identity(self, email: str) -> None:
+        self.identities.pop(email)
@@ -0,0 +1,106 @@
+import asyncio
+import binascii
+import hashlib
+import hmac
+import os
+from base64 import b64decode, b64encode
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.web.config import PasswordConfig
+
+SALT_SIZE = 16
+KEY_SIZE = 32
+
+
+def _b64(value: bytes) -> str:
+    return b64encode(value).decode()
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=KEY_SIZE
+    )
+
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=KEY_SIZE)
+
+
+def check_password(password: str, hashed: Optional[str]) -> bool:
+    """Verify a password against any hash format we have ever stored.
+
+    The cost parameters are read from the hash itself, so hashes made with
+    older settings keep working. A malformed hash never matches. This
+    runs the KDF inline; use PasswordHasher.verify from async code."""
+    if not hashed:
+        return False
+    algorithm, _, params = hashed.partition("$")
+    try:
+        if algorithm == "scrypt":
+            n, r, p, salt, key = params.split("$")
+            expected = _scrypt(password, b64decode(salt), int(n), int(r), int(p))
+            return hmac.compare_digest(expected, b64decode(key))
+        if algorithm == "pbkdf2_sha256":
+            iterations, salt, key = params.split("$")
+            expected = _pbkdf2(password, b64decode(salt), int(iterations))
+            return hmac.compare_digest(expected, b64decode(key))
+    except (ValueError, binascii.Error):
+        return False
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed)
+
+
+class PasswordHasher:
+    def __init__(self, config: PasswordConfig):
+        self.config = config
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def hash_sync(self, password: str) -> str:
+        salt = os.urandom(SALT_SIZE)
+        if self.config.algorithm == "scrypt":
+            n, r, p = self.config.scrypt_n, self.config.scrypt_r, self.config.scrypt_p
+            key = _scrypt(password, salt, n, r, p)
+            return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(key)}"
+        if self.config.algorithm == "pbkdf2_sha256":
+            iterations = self.config.pbkdf2_iterations
+            key = _pbkdf2(password, salt, iterations)
+            return f"pbkdf2_sha256${iterations}${_b64(salt)}${_b64(key)}"
+        raise ValueError(f"unknown password algorithm {self.config.algorithm}")
+
+    def needs_rehash(self, hashed: str) -> bool:
+        algorithm, _, params = hashed.partition("$")
+        if algorithm != self.config.algorithm:
+            return True
+        if algorithm == "scrypt":
+            n, r, p, *_ = params.split("$")
+            return (int(n), int(r), int(p)) != (
+                self.config.scrypt_n,
+                self.config.scrypt_r,
+                self.config.scrypt_p,
+            )
+        iterations, *_ = params.split("$")
+        return int(iterations) != self.config.pbkdf2_iterations
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.hash_sync, password)
+
+    async def verify(self, password: str, hashed: Optional[str]) -> bool:
+        return await self._run(check_password, password, hashed)
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.workers, thread_name_prefix="password-hasher"
+            )
+            self._semaphore = asyncio.Semaphore(self.config.workers)
+        # bound in-flight work so a login storm waits here instead of
+        # piling up in the executor queue
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._semaphore = None
@@ -0,0 +1,134 @@
+import asyncio
+import typing
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.bot.models import ProcessedUpdateModel
+from app.store.vk_api.dataclasses import Update
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+
+def update_key(update: Update) -> str:
+    """What identifies an update: its event_id, otherwise the message's
+    number within its chat. Chat messages all have ``id`` 0, so the message
+    id is only used for updates that carry neither."""
+    if update.event_id is not None:
+        return update.event_id
+    obj = update.object
+    if obj.conversation_message_id is not None:
+        return f"{obj.peer_id}:{obj.conversation_message_id}"
+    return str(obj.id)
+
+
+class UpdateDeduplicator:
+    """Drops updates that were already seen.
+
+    Recent keys are kept in memory, bounded to ``max_size`` with FIFO
+    eviction. With ``persistent`` enabled handled keys are also written to
+    ``processed_updates`` so a restart that replays a ts does not reply twice.
+    """
+
+    def __init__(self, app: "Application"):
+        self.app = app
+        self.config = app.config.bot
+        self.logger = getLogger("dedup")
+        # dicts keep insertion order, the first key is the oldest
+        self.seen: dict[str, None] = {}
+        self.duplicates = 0
+        self.cleanup_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.config.dedup_persistent and self.cleanup_task is None:
+            self.cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    def stop(self) -> None:
+        if self.cleanup_task:
+            self.cleanup_task.cancel()
+            self.cleanup_task = None
+
+    def clear(self) -> None:
+        self.seen.clear()
+
+    def _remember(self, key: str) -> None:
+        self.seen[key] = None
+        if len(self.seen) > self.config.dedup_size:
+            del self.seen[next(iter(self.seen))]
+
+    def filter(self, updates: list[Update]) -> list[Update]:
+        """Drop updates seen by this process. Never waits, so callers can
+        dedup and dispatch a batch without letting another batch in."""
+        fresh = []
+        for update in updates:
+            key = update_key(update)
+            if key in self.seen:
+                continue
+            self._remember(key)
+            fresh.append(update)
+        self.duplicates += len(updates) - len(fresh)
+        return fresh
+
+    async def processed(self, updates: list[Update]) -> set[str]:
+        """Keys of ``updates`` already handled before a restart."""
+        if not updates or not self.config.dedup_persistent:
+            return set()
+        keys = [update_key(update) for update in updates]
+        async with self.app.database.transaction() as session:
+            return set(
+                await session.scalars(
+                    select(ProcessedUpdateModel.update_key).where(
+                        ProcessedUpdateModel.update_key.in_(keys)
+                    )
+                )
+            )
+
+    def exclude(self, updates: list[Update], processed: set[str]) -> list[Update]:
+        fresh = [update for update in updates if update_key(update) not in processed]
+        self.duplicates += len(updates) - len(fresh)
+        return fresh
+
+    async def mark_processed(self, updates: list[Update]) -> None:
+        if not updates or not self.config.dedup_persistent:
+            return
+        query = (
+            pg_insert(ProcessedUpdateModel)
+            .values([{"update_key": update_key(update)} for update in updates])
+            .on_conflict_do_nothing(index_elements=[ProcessedUpdateModel.update_key])
+        )
+        async with self.app.database.transaction() as session:
+            await session.execute(query)
+
+    async def delete_expired(self, limit: int) -> int:
+        expired = (
+            select(ProcessedUpdateModel.id)
+            .where(
+                ProcessedUpdateModel.processed_at
+                <= datetime.now(timezone.utc) - timedelta(seconds=self.config.dedup_retention)
+            )
+            .limit(limit)
+        )
+        async with self.app.database.transaction() as session:
+            res = await session.execute(
+                delete(ProcessedUpdateModel)
+                .where(ProcessedUpdateModel.id.in_(expired))
+                .execution_options(synchronize_session=False)
+            )
+        return res.rowcount
+
+    async def _cleanup_loop(self) -> None:
+        batch_size = self.config.dedup_cleanup_batch_size
+        while True:
+            await asyncio.sleep(self.config.dedup_cleanup_interval)
+            try:
+                while await self.delete_expired(batch_size) == batch_size:
+                    await asyncio.sleep(0)
+            except Exception as e:
+                self.logger.error("Exception", exc_info=e)
+
+    def stats(self) -> dict:
+        return {"size": len(self.seen), "duplicates": self.duplicates}
@@ -1,6 +1,11 @@
+import asyncio
 import typing
+from collections import defaultdict
 from logging import getLogger
+from typing import Optional
 
+from app.store.bot.dedup import UpdateDeduplicator
+from app.store.bot.queue import OutboundQueue
 from app.store.vk_api.dataclasses import Message, Update
 
 if typing.TYPE_CHECKING:
@@ -12,12 +17,118 @@ class BotManager:
         self.app = app
         self.bot = None
         self.logger = getLogger("handler")
+        self.outbound = OutboundQueue(
+            self._send,
+            workers=app.config.bot.send_workers,
+            max_size=app.config.bot.outbound_queue_size,
+        )
+        self.dedup = UpdateDeduplicator(app)
+        self.semaphore = asyncio.Semaphore(app.config.bot.handler_concurrency)
+        # last dispatched task per chat, the next batch for the chat waits on it
+        self.peer_tails: dict[int, asyncio.Task] = {}
+        # batches accepted by submit() that are still being handled
+        self.pending: set[asyncio.Task] = set()
+        app.on_startup.append(self.connect)
+        app.on_shutdown.append(self.disconnect)
+
+    async def connect(self, app: "Application"):
+        self.outbound.start()
+        self.dedup.start()
+
+    async def disconnect(self, app: "Application"):
+        await self.join_pending()
+        self.dedup.stop()
+        await self.outbound.stop()
+
+    def submit(self, updates: list[Update]) -> None:
+        """Handle ``updates`` in the background, for callers that must
+        answer right away. Tasks start in submission order, so batches keep
+        their order per chat; disconnect waits for them."""
+        task = asyncio.create_task(self._handle_submitted(updates))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def _handle_submitted(self, updates: list[Update]) -> None:
+        # the task inherits the caller's context, not its transaction
+        self.app.database.detach()
+        try:
+            await self.handle_updates(updates)
+        except Exception as e:
+            self.logger.error("Exception", exc_info=e)
+
+    async def join_pending(self) -> None:
+        while self.pending:
+            await asyncio.wait(list(self.pending))
+
+    async def _send(self, message: Message):
+        return await self.app.store.vk_api.send_message(message)
 
     async def handle_updates(self, updates: list[Update]):
+        # nothing is awaited until every chat's updates are chained onto
+        # peer_tails, so batches handled concurrently keep their order
+        updates = self.dedup.filter(updates)
+        if not updates:
+            return
+        processed = asyncio.create_task(self._processed(updates))
+        by_peer: dict[int, list[Update]] = defaultdict(list)
         for update in updates:
-            await self.app.store.vk_api.send_message(
+            by_peer[update.object.peer_id or update.object.user_id].append(update)
+        handled = await asyncio.gather(
+            *(
+                self._dispatch(peer_id, peer_updates, processed)
+                for peer_id, peer_updates in by_peer.items()
+            )
+        )
+        await self.dedup.mark_processed([update for batch in handled for update in batch])
+
+    async def _processed(self, updates: list[Update]) -> set[str]:
+        self.app.database.detach()
+        return await self.dedup.processed(updates)
+
+    def _dispatch(
+        self, peer_id: int, updates: list[Update], processed: asyncio.Task
+    ) -> asyncio.Task:
+        task = asyncio.create_task(
+            self._handle_in_order(self.peer_tails.get(peer_id), updates, processed)
+        )
+        self.peer_tails[peer_id] = task
+
+        def forget(done: asyncio.Task):
+            if self.peer_tails.get(peer_id) is done:
+                del self.peer_tails[peer_id]
+
+        task.add_done_callback(forget)
+        return task
+
+    async def _handle_in_order(
+        self,
+        previous: Optional[asyncio.Task],
+        updates: list[Update],
+        processed: asyncio.Task,
+    ) -> list[Update]:
+        self.app.database.detach()
+        if previous is not None:
+            await asyncio.wait([previous])
+        updates = self.dedup.exclude(updates, await processed)
+        async with self.semaphore:
+            for update in updates:
+                try:
+                    await self.handle_update(update)
+                except Exception as e:
+                    self.logger.error("Exception", exc_info=e)
+        return updates
+
+    async def handle_update(self, update: Update):
+        replies = await self.app.store.games.handle_message(
+            peer_id=update.object.peer_id or update.object.user_id,
+            user_id=update.object.user_id,
+            text=update.object.body,
+        )
+        if replies:
+            await self.outbound.put(
                 Message(
                     user_id=update.object.user_id,
-                    text="Привет!",
+                    text="\n\n".join(replies),
+                    peer_id=update.object.peer_id,
                 )
             )
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from logging import getLogger
+from typing import Awaitable, Callable
+
+from app.store.vk_api.dataclasses import Message
+
+
+class OutboundQueue:
+    def __init__(
+        self,
+        send: Callable[[Message], Awaitable],
+        workers: int = 25,
+        max_size: int = 1000,
+    ):
+        self.send = send
+        self.workers_count = workers
+        self.max_size = max_size
+        self.queue: asyncio.Queue[Message] = asyncio.Queue(maxsize=max_size)
+        self.workers: list[asyncio.Task] = []
+        self.logger = getLogger("outbound")
+        self.sent = 0
+        self.failed = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def start(self) -> None:
+        if self.workers:
+            return
+        self.workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers_count)
+        ]
+
+    async def stop(self) -> None:
+        if not self.workers:
+            return
+        await self.queue.join()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def put(self, message: Message) -> None:
+        """Waits while the queue is full, so a slow VK slows the producer
+        down instead of growing the queue without bound."""
+        self.start()
+        await self.queue.put(message)
+
+    async def join(self) -> None:
+        await self.queue.join()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.queue.qsize(),
+            "max_size": self.max_size,
+            "workers": len(self.workers),
+            "sent": self.sent,
+            "failed": self.failed,
+            "latency_avg_ms": self.latency_total / self.sent * 1000 if self.sent else 0.0,
+            "latency_max_ms": self.latency_max * 1000,
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            message = await self.queue.get()
+            started = time.perf_counter()
+            try:
+                await self.send(message)
+            except Exception as e:
+                self.failed += 1
+                self.logger.error("Exception", exc_info=e)
+            else:
+                latency = time.perf_counter() - started
+                self.sent += 1
+                self.latency_total += latency
+                self.latency_max = max(self.latency_max, latency)
+            finally:
+                self.queue.task_done()
@@ -1,2 +1,4 @@
 from app.admin.models import *
 from app.quiz.models import *
+from app.bot.models import *
+from app.game.models import *
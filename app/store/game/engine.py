@@ -0,0 +1,268 @@
+import asyncio
+import random
+import typing
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.base.base_accessor import BaseAccessor
+from app.game.models import GameModel, GameScoreModel
+from app.quiz.models import Question
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+HELP_TEXT = (
+    "/start <id темы> — начать игру\n"
+    "/stop — закончить игру\n"
+    "/score — текущий счёт"
+)
+
+
+@dataclass(slots=True)
+class GameState:
+    game_id: int
+    peer_id: int
+    theme_id: Optional[int]
+    question: Optional[Question] = None
+    correct: frozenset[str] = frozenset()
+    asked: list[int] = field(default_factory=list)
+    # shuffled ids of the questions not asked yet, the next one is popped
+    remaining: list[int] = field(default_factory=list)
+    scores: dict[int, int] = field(default_factory=dict)
+    finished_at: Optional[datetime] = None
+    dirty: bool = False
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def correct_answers(question: Optional[Question]) -> frozenset[str]:
+    if question is None:
+        return frozenset()
+    return frozenset(
+        normalize(answer.title) for answer in question.answers if answer.is_correct
+    )
+
+
+class GameEngine(BaseAccessor):
+    """Quiz games keyed by peer_id.
+
+    Answers only touch the in-memory GameState. Changed games are written
+    to ``games``/``game_scores`` every ``game.flush_interval`` seconds and
+    on shutdown; active games are loaded back on startup.
+    """
+
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        self.games: dict[int, GameState] = {}
+        # finished games that still have to be flushed
+        self.finished: list[GameState] = []
+        self.flush_task: Optional[asyncio.Task] = None
+        self.flush_lock = asyncio.Lock()
+        app.on_shutdown.append(self.shutdown)
+
+    async def connect(self, app: "Application"):
+        await self.load_active_games()
+        self.flush_task = asyncio.create_task(self._flush_loop())
+
+    async def shutdown(self, app: "Application"):
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
+        await self.flush()
+
+    def clear(self) -> None:
+        self.games.clear()
+        self.finished.clear()
+
+    async def handle_message(self, peer_id: int, user_id: int, text: str) -> list[str]:
+        command, _, argument = text.strip().partition(" ")
+        if command == "/start":
+            return await self.start_game(peer_id, argument.strip() or None)
+        if command == "/stop":
+            return self.finish_game(peer_id)
+        if command == "/score":
+            state = self.games.get(peer_id)
+            return [self.render_scores(state)] if state else ["Игра не идёт"]
+
+        state = self.games.get(peer_id)
+        if state is None:
+            return [HELP_TEXT]
+        return await self.answer(state, user_id, text)
+
+    async def start_game(self, peer_id: int, theme_id: Optional[str]) -> list[str]:
+        if peer_id in self.games:
+            return ["Игра уже идёт"]
+        if theme_id is not None and not theme_id.isdigit():
+            return [HELP_TEXT]
+        theme_id = int(theme_id) if theme_id is not None else None
+        remaining = await self.app.store.quizzes.list_question_ids(theme_id=theme_id)
+        if not remaining:
+            return ["Нет вопросов по этой теме"]
+        random.shuffle(remaining)
+
+        # the only write on the message path, ids come from the database
+        async with self.app.database.transaction() as session:
+            game_id = await session.scalar(
+                insert(GameModel)
+                .values(peer_id=peer_id, theme_id=theme_id)
+                .returning(GameModel.id)
+            )
+        state = GameState(
+            game_id=game_id, peer_id=peer_id, theme_id=theme_id, remaining=remaining
+        )
+        self.games[peer_id] = state
+        question = await self.next_question(state)
+        if question is None:
+            return self.finish_game(peer_id)
+        return ["Игра началась!", question.title]
+
+    async def next_question(self, state: GameState) -> Optional[Question]:
+        while state.remaining:
+            question = await self.app.store.quizzes.get_question_by_id(state.remaining.pop())
+            # None if the question was deleted since the game started
+            if question is not None:
+                self.set_question(state, question)
+                return question
+        return None
+
+    @staticmethod
+    def set_question(state: GameState, question: Optional[Question]) -> None:
+        state.question = question
+        state.correct = correct_answers(question)
+        if question:
+            state.asked.append(question.id)
+        state.dirty = True
+
+    async def answer(self, state: GameState, user_id: int, text: str) -> list[str]:
+        if state.question is None or normalize(text) not in state.correct:
+            return []
+        state.scores[user_id] = state.scores.get(user_id, 0) + 1
+        # nobody else can score on this question while the next one loads
+        self.set_question(state, None)
+
+        question = await self.next_question(state)
+        if question is None:
+            return ["Верно!", *self.finish_game(state.peer_id)]
+        return ["Верно!", question.title]
+
+    def finish_game(self, peer_id: int) -> list[str]:
+        state = self.games.pop(peer_id, None)
+        if state is None:
+            return ["Игра не идёт"]
+        state.question = None
+        state.finished_at = datetime.now(timezone.utc)
+        state.dirty = True
+        self.finished.append(state)
+        return ["Игра окончена", self.render_scores(state)]
+
+    @staticmethod
+    def render_scores(state: GameState) -> str:
+        if not state.scores:
+            return "Счёт: пока никто не ответил"
+        ranking = sorted(state.scores.items(), key=lambda item: -item[1])
+        return "Счёт:\n" + "\n".join(f"id{user_id}: {points}" for user_id, points in ranking)
+
+    async def flush(self) -> None:
+        async with self.flush_lock:
+            states = [state for state in self.games.values() if state.dirty]
+            states += self.finished
+            if not states:
+                return
+            finished, self.finished = self.finished, []
+            for state in states:
+                state.dirty = False
+
+            games = [
+                {
+                    "b_id": state.game_id,
+                    "question_id": state.question.id if state.question else None,
+                    "asked_question_ids": list(state.asked),
+                    "is_active": state.finished_at is None,
+                    "finished_at": state.finished_at,
+                }
+                for state in states
+            ]
+            scores = [
+                {"game_id": state.game_id, "user_id": user_id, "points": points}
+                for state in states
+                for user_id, points in state.scores.items()
+            ]
+            try:
+                async with self.app.database.transaction() as session:
+                    await session.execute(
+                        update(GameModel.__table__)
+                        .where(GameModel.__table__.c.id == bindparam("b_id"))
+                        .values(
+                            question_id=bindparam("question_id"),
+                            asked_question_ids=bindparam("asked_question_ids"),
+                            is_active=bindparam("is_active"),
+                            finished_at=bindparam("finished_at"),
+                        ),
+                        games,
+                    )
+                    if scores:
+                        query = pg_insert(GameScoreModel).values(scores)
+                        await session.execute(
+                            query.on_conflict_do_update(
+                                index_elements=[GameScoreModel.game_id, GameScoreModel.user_id],
+                                set_={"points": query.excluded.points},
+                            )
+                        )
+            except Exception:
+                for state in states:
+                    state.dirty = True
+                self.finished = finished + self.finished
+                raise
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.app.config.game.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.logger.error("Exception", exc_info=e)
+
+    async def load_active_games(self) -> None:
+        async with self.app.database.transaction() as session:
+            games = (
+                await session.scalars(select(GameModel).where(GameModel.is_active))
+            ).all()
+            scores = (
+                await session.scalars(
+                    select(GameScoreModel).where(
+                        GameScoreModel.game_id.in_([game.id for game in games])
+                    )
+                )
+            ).all() if games else []
+
+        by_game: dict[int, dict[int, int]] = {}
+        for score in scores:
+            by_game.setdefault(score.game_id, {})[score.user_id] = score.points
+
+        question_ids: dict[Optional[int], list[int]] = {}
+        for game in games:
+            if game.theme_id not in question_ids:
+                question_ids[game.theme_id] = await self.app.store.quizzes.list_question_ids(
+                    theme_id=game.theme_id
+                )
+            asked = set(game.asked_question_ids)
+            remaining = [id_ for id_ in question_ids[game.theme_id] if id_ not in asked]
+            random.shuffle(remaining)
+            state = GameState(
+                game_id=game.id,
+                peer_id=game.peer_id,
+                theme_id=game.theme_id,
+                asked=list(game.asked_question_ids),
+                remaining=remaining,
+                scores=by_game.get(game.id, {}),
+            )
+            if game.question_id is not None:
+                state.question = await self.app.store.quizzes.get_question_by_id(game.question_id)
+                state.correct = correct_answers(state.question)
+            self.games[game.peer_id] = state
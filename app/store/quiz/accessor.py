@@ -1,84 +1,318 @@
-from sqlalchemy import insert, select
+import typing
+from typing import AsyncIterator
+
+from sqlalchemy import func, insert, select, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 
 from app.base.base_accessor import BaseAccessor
+from app.base.cache import TTLCache
 from app.quiz.models import (
     Answer,
     Question,
+    RejectedQuestion,
     Theme,
     AnswerModel,
     QuestionModel,
     ThemeModel
 )
 
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+IMPORT_BATCH_SIZE = 1000
+ANSWERS_CHUNK_SIZE = 5000
+CACHE_CHANNEL = "quiz_cache"
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+DUPLICATE_TITLE = RejectedQuestion(
+    code=UNIQUE_VIOLATION, field="title", message="Question with this title already exists."
+)
+
 
 class QuizAccessor(BaseAccessor):
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        config = app.config.cache
+        self.themes_cache = TTLCache(max_size=config.max_size, ttl=config.ttl)
+        self.theme_lists_cache = TTLCache(max_size=config.max_size, ttl=config.ttl)
+        self.question_lists_cache = TTLCache(max_size=config.max_size, ttl=config.ttl)
+        self.questions_cache = TTLCache(max_size=config.max_size, ttl=config.ttl)
+
+    async def connect(self, app: "Application"):
+        await app.database.subscribe(CACHE_CHANNEL, self.apply_changes)
+
+    def cache_stats(self) -> dict:
+        return {
+            "themes": self.themes_cache.stats(),
+            "theme_lists": self.theme_lists_cache.stats(),
+            "question_lists": self.question_lists_cache.stats(),
+            "questions": self.questions_cache.stats(),
+        }
+
+    def clear_cache(self) -> None:
+        self.themes_cache.clear()
+        self.theme_lists_cache.clear()
+        self.question_lists_cache.clear()
+        self.questions_cache.clear()
+
+    def invalidate_themes(self, theme_ids: typing.Iterable[int] = (), titles: typing.Iterable[str] = ()) -> None:
+        for theme_id in theme_ids:
+            self.themes_cache.pop(("id", theme_id))
+        for title in titles:
+            self.themes_cache.pop(("title", title))
+        self.theme_lists_cache.clear()
+
+    def invalidate_questions(self, theme_ids: typing.Iterable[int]) -> None:
+        theme_ids = set(theme_ids) | {None}
+        self.question_lists_cache.invalidate(lambda key: key[0] in theme_ids)
+
+    def apply_changes(self, changes: dict) -> None:
+        if changes.get("reset"):
+            self.clear_cache()
+            return
+        if "theme_ids" in changes or "titles" in changes:
+            self.invalidate_themes(changes.get("theme_ids", []), changes.get("titles", []))
+        for question_id in changes.get("question_ids", []):
+            self.questions_cache.pop(question_id)
+        if "question_theme_ids" in changes:
+            self.invalidate_questions(changes["question_theme_ids"])
+        elif "question_ids" in changes:
+            self.question_lists_cache.clear()
+
+    async def _publish_changes(
+            self, session, statement, returned_ids: str | None = None, **changes
+    ) -> list:
+        """Run ``statement`` (an INSERT ... RETURNING) with the NOTIFY for
+        ``changes`` folded into it, so other workers hear about the write
+        without an extra round trip. One notification is sent per statement,
+        none when no row comes back; local caches are invalidated after
+        commit. The returned ids go into ``changes[returned_ids]``."""
+        inserted = statement.cte("inserted")
+        columns = {returned_ids: inserted.c.id} if returned_ids else {}
+        notified = (
+            select(self.app.database.notify_clause(CACHE_CHANNEL, changes, **columns).label("notified"))
+            .select_from(inserted)
+            .having(func.count() > 0)
+            .cte("notified")
+        )
+        rows = (
+            await session.execute(
+                select(inserted, notified.c.notified).select_from(inserted.join(notified, true()))
+            )
+        ).all()
+        if rows:
+            if returned_ids:
+                changes[returned_ids] = [row.id for row in rows]
+            self.app.database.after_commit(lambda: self.apply_changes(changes))
+        return rows
+
+    def _cache_after_commit(self, cache: TTLCache, key, value, generation: int) -> None:
+        """Cache a value read from the database once the reading transaction
+        commits, unless the cache was invalidated after ``generation`` was
+        taken: a change may have been committed after the read."""
+        self.app.database.after_commit(lambda: cache.set(key, value, generation=generation))
+
     async def _get_wrapped_theme_by_title(self, title: str) -> ThemeModel | None:
         query = select(ThemeModel).where(ThemeModel.title == title)
-        async with self.app.database.session.begin() as session:
+        async with self.app.database.transaction() as session:
             res = await session.execute(query)
             wrapped_theme = res.scalars().first()
-            await session.commit()
         return wrapped_theme
 
     async def create_theme(self, title: str) -> Theme:
-        async with self.app.database.session() as session:
-            session.add(ThemeModel(title=title))
-            await session.commit()
+        query_insert_theme = (
+            insert(ThemeModel)
+            .values(title=title)
+            .returning(ThemeModel.id, ThemeModel.title)
+        )
+        async with self.app.database.transaction() as session:
+            [wrapped_theme] = await self._publish_changes(
+                session, query_insert_theme, returned_ids="theme_ids", titles=[title]
+            )
 
-        wrapped_theme = await self._get_wrapped_theme_by_title(title)
         return Theme(
             id=wrapped_theme.id,
             title=wrapped_theme.title
         )
 
+    async def create_theme_if_not_exists(self, title: str) -> Theme | None:
+        query_insert_theme = (
+            pg_insert(ThemeModel)
+            .values(title=title)
+            .on_conflict_do_nothing(index_elements=[ThemeModel.title])
+            .returning(ThemeModel.id, ThemeModel.title)
+        )
+        async with self.app.database.transaction() as session:
+            rows = await self._publish_changes(
+                session, query_insert_theme, returned_ids="theme_ids", titles=[title]
+            )
+
+        if rows:
+            return Theme(id=rows[0].id, title=rows[0].title)
+
     async def get_theme_by_title(self, title: str) -> Theme | None:
+        if (theme := self.themes_cache.get(("title", title))) is not None:
+            return theme
+
+        generation = self.themes_cache.generation
         wrapped_theme = await self._get_wrapped_theme_by_title(title)
         if wrapped_theme is not None:
-            return Theme(id=wrapped_theme.id, title=wrapped_theme.title)
+            theme = Theme(id=wrapped_theme.id, title=wrapped_theme.title)
+            self._cache_after_commit(self.themes_cache, ("title", title), theme, generation)
+            return theme
 
     async def get_theme_by_id(self, id_: int) -> Theme | None:
+        if (theme := self.themes_cache.get(("id", id_))) is not None:
+            return theme
+
+        generation = self.themes_cache.generation
         query_get_by_id = select(ThemeModel).where(ThemeModel.id == id_)
-        async with self.app.database.session.begin() as session:
+        async with self.app.database.transaction() as session:
             res = await session.execute(query_get_by_id)
             wrapped_theme = res.scalars().first()
-            await session.commit()
         if wrapped_theme is not None:
-            return Theme(id=wrapped_theme.id, title=wrapped_theme.title)
+            theme = Theme(id=wrapped_theme.id, title=wrapped_theme.title)
+            self._cache_after_commit(self.themes_cache, ("id", id_), theme, generation)
+            return theme
 
-    async def list_themes(self) -> list[Theme]:
-        async with self.app.database.session.begin() as session:
-            Q = select(ThemeModel)
+    async def list_themes(
+            self, limit: int | None = None, after_id: int | None = None
+    ) -> list[Theme]:
+        if (themes := self.theme_lists_cache.get((limit, after_id))) is not None:
+            return list(themes)
+
+        generation = self.theme_lists_cache.generation
+        Q = select(ThemeModel).order_by(ThemeModel.id).limit(limit)
+        if after_id is not None:
+            Q = Q.where(ThemeModel.id > after_id)
+
+        async with self.app.database.transaction() as session:
             res = await session.execute(Q)
             wrapped_data = res.scalars().all()
-            await session.commit()
-        return [Theme(id=data.id, title=data.title) for data in wrapped_data]
+
+        themes = [Theme(id=data.id, title=data.title) for data in wrapped_data]
+        self._cache_after_commit(self.theme_lists_cache, (limit, after_id), themes, generation)
+        return list(themes)
 
     async def create_answers(
             self, question_id: int, answers: list[Answer]
     ) -> list[Answer]:
-        async with self.app.database.session() as session:
-            answer_models = [
-                AnswerModel(
-                    title=answer.title,
-                    is_correct=answer.is_correct,
-                    question_id=question_id
-                ) for answer in answers
-            ]
-            session.add_all(answer_models)
-            await session.commit()
+        if answers:
+            async with self.app.database.transaction() as session:
+                await self._publish_changes(
+                    session,
+                    self._insert_answers_query(question_id, answers).returning(AnswerModel.id),
+                    question_ids=[question_id],
+                )
         return answers
 
+    @staticmethod
+    def _insert_answers_query(question_id: int, answers: list[Answer]):
+        return insert(AnswerModel).values([
+            {
+                "title": answer.title,
+                "is_correct": answer.is_correct,
+                "question_id": question_id,
+            } for answer in answers
+        ])
+
     async def create_question(
             self, title: str, theme_id: int, answers: list[Answer]
     ) -> Question:
-        question = QuestionModel(title=title, theme_id=theme_id)
-        async with self.app.database.session() as session:
-            session.add(question)
-            await session.commit()
-            await session.refresh(question)
+        query_insert_question = (
+            insert(QuestionModel)
+            .values(title=title, theme_id=theme_id)
+            .returning(QuestionModel.id)
+        )
+        async with self.app.database.transaction() as session:
+            [row] = await self._publish_changes(
+                session, query_insert_question,
+                returned_ids="question_ids", question_theme_ids=[theme_id],
+            )
+            question_id = row.id
+            if answers:
+                await session.execute(self._insert_answers_query(question_id, answers))
+        return Question(id=question_id, theme_id=theme_id, title=title, answers=answers)
 
-            wrapped_answers = await self.create_answers(question.id, answers)
-        return Question(id=question.id, theme_id=question.theme_id, title=question.title, answers=wrapped_answers)
+    async def get_existing_theme_ids(self, theme_ids: set[int]) -> set[int]:
+        query = select(ThemeModel.id).where(ThemeModel.id.in_(theme_ids))
+        async with self.app.database.transaction() as session:
+            res = await session.scalars(query)
+            return set(res.all())
+
+    async def create_questions(
+            self, questions: list[Question]
+    ) -> list[Question | RejectedQuestion]:
+        """Insert questions in batches, returning a RejectedQuestion for each
+        one that was not created.
+
+        Each batch goes in as two multi-row inserts inside a savepoint. If an
+        answer title collides, that batch is replayed row by row so only the
+        offending questions are skipped.
+        """
+        created = []
+        async with self.app.database.transaction() as session:
+            for start in range(0, len(questions), IMPORT_BATCH_SIZE):
+                batch = questions[start:start + IMPORT_BATCH_SIZE]
+                try:
+                    async with session.begin_nested():
+                        created += await self._insert_questions(session, batch)
+                except IntegrityError:
+                    for question in batch:
+                        try:
+                            async with session.begin_nested():
+                                created += await self._insert_questions(session, [question])
+                        except IntegrityError as e:
+                            created.append(self._rejected(e))
+
+        return created
+
+    @staticmethod
+    def _rejected(error: IntegrityError) -> RejectedQuestion:
+        # title conflicts are skipped by ON CONFLICT, so in a replayed row
+        # only the theme reference or the answers can fail
+        code = error.orig.pgcode
+        return RejectedQuestion(
+            code=code,
+            field="theme_id" if code == FOREIGN_KEY_VIOLATION else "answers",
+            message=str(getattr(error.orig.__cause__, "message", error.orig)),
+        )
+
+    async def _insert_questions(
+            self, session, questions: list[Question]
+    ) -> list[Question | RejectedQuestion]:
+        res = await self._publish_changes(
+            session,
+            pg_insert(QuestionModel)
+            .values([{"title": question.title, "theme_id": question.theme_id} for question in questions])
+            .on_conflict_do_nothing(index_elements=[QuestionModel.title])
+            .returning(QuestionModel.id, QuestionModel.title),
+            question_theme_ids=sorted({question.theme_id for question in questions}),
+        )
+        ids = {row.title: row.id for row in res}
+
+        created = []
+        for question in questions:
+            question_id = ids.pop(question.title, None)
+            created.append(
+                DUPLICATE_TITLE if question_id is None else Question(
+                    id=question_id,
+                    title=question.title,
+                    theme_id=question.theme_id,
+                    answers=question.answers,
+                )
+            )
+
+        answers = [
+            {"title": answer.title, "is_correct": answer.is_correct, "question_id": question.id}
+            for question in created if isinstance(question, Question)
+            for answer in question.answers
+        ]
+        for start in range(0, len(answers), ANSWERS_CHUNK_SIZE):
+            await session.execute(insert(AnswerModel).values(answers[start:start + ANSWERS_CHUNK_SIZE]))
+        return created
 
     @classmethod
     async def _serialize_answer(cls, answer: AnswerModel) -> Answer:
@@ -89,49 +323,128 @@ class QuizAccessor(BaseAccessor):
         return [await cls._serialize_answer(answer) for answer in list_answers]
 
     async def get_question_by_title(self, title: str) -> Question | None:
-        async with self.app.database.session() as session:
-            Q = select(QuestionModel).where(QuestionModel.title == title)
+        async with self.app.database.transaction() as session:
+            Q = (
+                select(QuestionModel)
+                .options(selectinload(QuestionModel.answers))
+                .where(QuestionModel.title == title)
+            )
             res = await session.execute(Q)
             wrapped_question = res.scalars().first()
-            await session.commit()
-
-            if wrapped_question is not None:
-                query = select(AnswerModel).where(AnswerModel.question_id == wrapped_question.id)
-                res = await session.execute(query)
-                wrapped_answers = res.scalars().all()
-                await session.commit()
-
-                question = Question(
-                    id=wrapped_question.id,
-                    title=wrapped_question.title,
-                    theme_id=wrapped_question.theme_id,
-                    answers=await self._serialize_answers(wrapped_answers)
-                )
-                return question
 
-    async def list_questions(self, theme_id: int | None = None) -> list[Question]:
-        if theme_id is None:
-            query_get_questions = select(QuestionModel)
-        else:
-            query_get_questions = select(QuestionModel).where(QuestionModel.theme_id == int(theme_id))
+        if wrapped_question is not None:
+            return Question(
+                id=wrapped_question.id,
+                title=wrapped_question.title,
+                theme_id=wrapped_question.theme_id,
+                answers=await self._serialize_answers(wrapped_question.answers)
+            )
+
+    async def get_question_by_id(self, id_: int) -> Question | None:
+        if (question := self.questions_cache.get(id_)) is not None:
+            return question.copy()
+
+        generation = self.questions_cache.generation
+        async with self.app.database.transaction() as session:
+            Q = (
+                select(QuestionModel)
+                .options(selectinload(QuestionModel.answers))
+                .where(QuestionModel.id == id_)
+            )
+            res = await session.execute(Q)
+            wrapped_question = res.scalars().first()
+
+        if wrapped_question is not None:
+            question = Question(
+                id=wrapped_question.id,
+                title=wrapped_question.title,
+                theme_id=wrapped_question.theme_id,
+                answers=await self._serialize_answers(wrapped_question.answers)
+            )
+            self._cache_after_commit(self.questions_cache, id_, question, generation)
+            return question.copy()
+
+    async def list_question_ids(self, theme_id: int | None = None) -> list[int]:
+        query = select(QuestionModel.id).order_by(QuestionModel.id)
+        if theme_id is not None:
+            query = query.where(QuestionModel.theme_id == theme_id)
+        async with self.app.database.transaction() as session:
+            return list(await session.scalars(query))
+
+    async def list_questions(
+            self,
+            theme_id: int | None = None,
+            limit: int | None = None,
+            after_id: int | None = None,
+    ) -> list[Question]:
+        if theme_id is not None:
+            theme_id = int(theme_id)
+        cache_key = (theme_id, limit, after_id)
+        if (questions := self.question_lists_cache.get(cache_key)) is not None:
+            return [question.copy() for question in questions]
+
+        generation = self.question_lists_cache.generation
+        query_get_questions = (
+            select(QuestionModel)
+            .options(selectinload(QuestionModel.answers))
+            .order_by(QuestionModel.id)
+            .limit(limit)
+        )
+        if theme_id is not None:
+            query_get_questions = query_get_questions.where(QuestionModel.theme_id == theme_id)
+        if after_id is not None:
+            query_get_questions = query_get_questions.where(QuestionModel.id > after_id)
 
-        questions = list()
-        async with self.app.database.session.begin() as session:
+        async with self.app.database.transaction() as session:
             res = await session.execute(query_get_questions)
             wrapped_questions = res.scalars().all()
-            await session.commit()
 
-        for question in wrapped_questions:
-            query_get_answer_by_id = select(AnswerModel).where(AnswerModel.question_id == question.id)
-            async with self.app.database.session.begin() as session:
-                res = await session.execute(query_get_answer_by_id)
-                wrapped_answers = res.scalars().all()
-                await session.commit()
-
-            questions += [Question(
+        questions = [
+            Question(
                 id=question.id,
                 title=question.title,
                 theme_id=question.theme_id,
-                answers=await self._serialize_answers(wrapped_answers)
-            )]
-        return questions
+                answers=await self._serialize_answers(question.answers)
+            )
+            for question in wrapped_questions
+        ]
+        self._cache_after_commit(self.question_lists_cache, cache_key, questions, generation)
+        return [question.copy() for question in questions]
+
+    async def export_catalog(
+            self, batch_size: int = 1000
+    ) -> AsyncIterator[list[Theme | Question]]:
+        query_themes = select(ThemeModel.id, ThemeModel.title).order_by(ThemeModel.id)
+        query_questions = (
+            select(
+                QuestionModel.id,
+                QuestionModel.title,
+                QuestionModel.theme_id,
+                AnswerModel.title.label("answer_title"),
+                AnswerModel.is_correct,
+            )
+            .outerjoin(AnswerModel, AnswerModel.question_id == QuestionModel.id)
+            .order_by(QuestionModel.id, AnswerModel.id)
+        )
+
+        async with self.app.database.transaction() as session:
+            themes = await session.stream(query_themes)
+            async for partition in themes.partitions(batch_size):
+                yield [Theme(id=row.id, title=row.title) for row in partition]
+
+            question = None
+            rows = await session.stream(query_questions)
+            async for partition in rows.partitions(batch_size):
+                questions = []
+                for row in partition:
+                    if question is None or question.id != row.id:
+                        if question is not None:
+                            questions.append(question)
+                        question = Question(id=row.id, title=row.title, theme_id=row.theme_id, answers=[])
+                    if row.answer_title is not None:
+                        question.answers.append(Answer(title=row.answer_title, is_correct=row.is_correct))
+                if questions:
+                    yield questions
+
+            if question is not None:
+                yield [question]
@@ -0,0 +1,138 @@
+import asyncio
+import typing
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.admin.models import SessionModel
+from app.base.base_accessor import BaseAccessor
+from app.base.cache import TTLCache
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+
+class SessionAccessor(BaseAccessor, ABC):
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        self.config = app.config.session
+        self.cleanup_task: Optional[asyncio.Task] = None
+
+    async def connect(self, app: "Application"):
+        self.cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    async def disconnect(self, app: "Application"):
+        if self.cleanup_task:
+            self.cleanup_task.cancel()
+            self.cleanup_task = None
+
+    @abstractmethod
+    async def load(self, key: str) -> str | None:
+        ...
+
+    @abstractmethod
+    async def save(self, key: str, data: str, max_age: int) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_expired(self, limit: int) -> int:
+        ...
+
+    async def _cleanup_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.cleanup_interval)
+            try:
+                while await self.delete_expired(self.config.cleanup_batch_size) == self.config.cleanup_batch_size:
+                    await asyncio.sleep(0)
+            except Exception as e:
+                self.logger.error("Exception", exc_info=e)
+
+
+class MemorySessionAccessor(SessionAccessor):
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        self.sessions = TTLCache(max_size=self.config.max_size, ttl=self.config.max_age)
+
+    async def load(self, key: str) -> str | None:
+        return self.sessions.get(key)
+
+    async def save(self, key: str, data: str, max_age: int) -> None:
+        self.sessions.set(key, data)
+
+    async def delete(self, key: str) -> None:
+        self.sessions.pop(key)
+
+    async def delete_expired(self, limit: int) -> int:
+        return self.sessions.purge_expired(limit)
+
+
+class PostgresSessionAccessor(SessionAccessor):
+    """Sessions in the ``sessions`` table, shared by all workers.
+
+    Loaded sessions are kept in memory for ``session.cache_ttl`` seconds,
+    so an authenticated request usually does not touch the database.
+    """
+
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        self.cache = TTLCache(max_size=self.config.max_size, ttl=self.config.cache_ttl)
+
+    async def load(self, key: str) -> str | None:
+        now = datetime.now(timezone.utc)
+        if (cached := self.cache.get(key)) is not None:
+            data, expires_at = cached
+            if expires_at > now:
+                return data
+            self.cache.pop(key)
+            return None
+
+        query = select(SessionModel.data, SessionModel.expires_at).where(
+            SessionModel.key == key,
+            SessionModel.expires_at > now,
+        )
+        async with self.app.database.transaction() as session:
+            row = (await session.execute(query)).first()
+        if row is None:
+            return None
+        self.cache.set(key, (row.data, row.expires_at))
+        return row.data
+
+    async def save(self, key: str, data: str, max_age: int) -> None:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=max_age)
+        query = (
+            pg_insert(SessionModel)
+            .values(key=key, data=data, expires_at=expires_at)
+            .on_conflict_do_update(
+                index_elements=[SessionModel.key],
+                set_={"data": data, "expires_at": expires_at},
+            )
+        )
+        async with self.app.database.transaction() as session:
+            await session.execute(query)
+            self.app.database.after_commit(lambda: self.cache.set(key, (data, expires_at)))
+
+    async def delete(self, key: str) -> None:
+        self.cache.pop(key)
+        async with self.app.database.transaction() as session:
+            await session.execute(delete(SessionModel).where(SessionModel.key == key))
+
+    async def delete_expired(self, limit: int) -> int:
+        expired = (
+            select(SessionModel.id)
+            .where(SessionModel.expires_at <= datetime.now(timezone.utc))
+            .limit(limit)
+        )
+        async with self.app.database.transaction() as session:
+            res = await session.execute(
+                delete(SessionModel)
+                .where(SessionModel.id.in_(expired))
+                .execution_options(synchronize_session=False)
+            )
+        return res.rowcount
@@ -1,18 +1,30 @@
+import logging
 import random
 import typing
 from typing import Optional
 
-from aiohttp import TCPConnector
+from aiohttp import ClientTimeout, TCPConnector
 from aiohttp.client import ClientSession
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.base.base_accessor import BaseAccessor
-from app.store.vk_api.dataclasses import Message, Update, UpdateObject
+from app.bot.models import PollStateModel
+from app.base.rate_limit import TokenBucket
+from app.base.serialization import loads
+from app.store.vk_api.batcher import (
+    Call,
+    ExecuteBatcher,
+    VkApiError,
+    build_execute_code,
+)
+from app.store.vk_api.dataclasses import Message, Update, parse_updates
 from app.store.vk_api.poller import Poller
 
 if typing.TYPE_CHECKING:
     from app.web.app import Application
 
-API_PATH = "https://api.vk.com/method/"
+API_VERSION = "5.131"
 
 
 class VkApiAccessor(BaseAccessor):
@@ -23,35 +35,98 @@ class VkApiAccessor(BaseAccessor):
         self.server: Optional[str] = None
         self.poller: Optional[Poller] = None
         self.ts: Optional[int] = None
+        config = app.config.bot
+        self.poll_timeout = ClientTimeout(
+            total=config.poll_timeout, sock_connect=config.connect_timeout
+        )
+        self.send_timeout = ClientTimeout(
+            total=config.send_timeout, sock_connect=config.connect_timeout
+        )
+        # polling stops on shutdown, before the bot manager drains its
+        # outbound queue and before cleanup closes the session
+        app.on_shutdown.append(self.stop_polling)
+        self.limiter = TokenBucket(config.rate_limit)
+        self.batcher = ExecuteBatcher(
+            self._execute,
+            max_size=config.batch_size,
+            delay=config.batch_delay,
+            limiter=self.limiter,
+        )
 
-    # async def connect(self, app: "Application"):
-    #     self.session = ClientSession(connector=TCPConnector(verify_ssl=False))
-    #     try:
-    #         await self._get_long_poll_service()
-    #     except Exception as e:
-    #         self.logger.error("Exception", exc_info=e)
-    #     self.poller = Poller(app.store)
-    #     self.logger.info("start polling")
-    #     await self.poller.start()
-    #
-    # async def disconnect(self, app: "Application"):
-    #     if self.session:
-    #         await self.session.close()
-    #     if self.poller:
-    #         await self.poller.stop()
+    def _create_session(self) -> ClientSession:
+        config = self.app.config.bot
+        connector = TCPConnector(
+            limit_per_host=config.limit_per_host,
+            keepalive_timeout=config.keepalive_timeout,
+            ttl_dns_cache=config.dns_cache_ttl,
+        )
+        return ClientSession(connector=connector, timeout=self.send_timeout)
+
+    async def connect(self, app: "Application"):
+        self.session = self._create_session()
+
+    async def start_polling(self, app: "Application"):
+        """Runs last on startup (see Store), once every handler dependency
+        is connected, so replayed updates never reach a half-started app."""
+        if app.config.bot.mode != "polling":
+            return
+        try:
+            self.ts = await self.load_ts()
+            await self._get_long_poll_service(update_ts=self.ts is None)
+        except Exception as e:
+            self.logger.error("Exception", exc_info=e)
+        self.poller = Poller(
+            app.store,
+            queue_size=app.config.bot.poll_queue_size,
+            handlers=app.config.bot.poll_handlers,
+            backoff_base=app.config.bot.poll_backoff_base,
+            backoff_max=app.config.bot.poll_backoff_max,
+        )
+        self.logger.info("start polling")
+        await self.poller.start()
+
+    async def stop_polling(self, app: "Application"):
+        if self.poller:
+            await self.poller.stop()
+            self.poller = None
+
+    async def disconnect(self, app: "Application"):
+        await self.stop_polling(app)
+        await self.batcher.close()
+        if self.session:
+            await self.session.close()
 
     @staticmethod
     def _build_query(host: str, method: str, params: dict) -> str:
         url = host + method + "?"
         if "v" not in params:
-            params["v"] = "5.131"
+            params["v"] = API_VERSION
         url += "&".join([f"{k}={v}" for k, v in params.items()])
         return url
 
-    async def _get_long_poll_service(self):
+    async def load_ts(self) -> Optional[str]:
+        async with self.app.database.transaction() as session:
+            return await session.scalar(
+                select(PollStateModel.ts).where(
+                    PollStateModel.group_id == self.app.config.bot.group_id
+                )
+            )
+
+    async def save_ts(self, ts: str) -> None:
+        query = (
+            pg_insert(PollStateModel)
+            .values(group_id=self.app.config.bot.group_id, ts=str(ts))
+            .on_conflict_do_update(
+                index_elements=[PollStateModel.group_id], set_={"ts": str(ts)}
+            )
+        )
+        async with self.app.database.transaction() as session:
+            await session.execute(query)
+
+    async def _get_long_poll_service(self, update_ts: bool = True):
         async with self.session.get(
             self._build_query(
-                host=API_PATH,
+                host=self.app.config.bot.api_url,
                 method="groups.getLongPollServer",
                 params={
                     "group_id": self.app.config.bot.group_id,
@@ -63,10 +138,13 @@ class VkApiAccessor(BaseAccessor):
             self.logger.info(data)
             self.key = data["key"]
             self.server = data["server"]
-            self.ts = data["ts"]
+            if update_ts:
+                self.ts = data["ts"]
             self.logger.info(self.server)
 
-    async def poll(self):
+    async def poll(self) -> list[Update]:
+        if self.key is None:
+            await self._get_long_poll_service(update_ts=self.ts is None)
         async with self.session.get(
             self._build_query(
                 host=self.server,
@@ -75,41 +153,61 @@ class VkApiAccessor(BaseAccessor):
                     "act": "a_check",
                     "key": self.key,
                     "ts": self.ts,
-                    "wait": 30,
+                    "wait": self.app.config.bot.poll_wait,
                 },
-            )
+            ),
+            timeout=self.poll_timeout,
         ) as resp:
-            data = await resp.json()
-            self.logger.info(data)
+            data = loads(await resp.read())
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(data)
+
+        failed = data.get("failed")
+        if failed == 1:
+            # history is outdated or partly lost, continue from the new ts
             self.ts = data["ts"]
-            raw_updates = data.get("updates", [])
-            updates = []
-            for update in raw_updates:
-                updates.append(
-                    Update(
-                        type=update["type"],
-                        object=UpdateObject(
-                            id=update["object"]["id"],
-                            user_id=update["object"]["user_id"],
-                            body=update["object"]["body"],
-                        ),
-                    )
-                )
-            await self.app.store.bots_manager.handle_updates(updates)
+            return []
+        if failed == 2:
+            await self._get_long_poll_service(update_ts=False)
+            return []
+        if failed == 3:
+            await self._get_long_poll_service(update_ts=True)
+            return []
+        if failed is not None:
+            raise VkApiError("a_check", data)
+        self.ts = data["ts"]
+        return parse_updates(data.get("updates", []))
 
-    async def send_message(self, message: Message) -> None:
-        async with self.session.get(
-            self._build_query(
-                API_PATH,
-                "messages.send",
-                params={
-                    "user_id": message.user_id,
-                    "random_id": random.randint(1, 2**32),
-                    "peer_id": "-" + str(self.app.config.bot.group_id),
-                    "message": message.text,
-                    "access_token": self.app.config.bot.token,
-                },
-            )
+    async def _call(self, method: str, params: dict):
+        params = {
+            **params,
+            "access_token": self.app.config.bot.token,
+            "v": API_VERSION,
+        }
+        async with self.session.post(
+            self.app.config.bot.api_url + method, data=params
         ) as resp:
-            data = await resp.json()
-            self.logger.info(data)
+            data = loads(await resp.read())
+        if "error" in data:
+            raise VkApiError(method, data["error"])
+        if data.get("execute_errors"):
+            self.logger.warning(data["execute_errors"])
+        return data["response"]
+
+    async def _execute(self, calls: list[Call]) -> list:
+        if len(calls) == 1:
+            method, params = calls[0]
+            return [await self._call(method, params)]
+        return await self._call("execute", {"code": build_execute_code(calls)})
+
+    async def send_message(self, message: Message) -> int:
+        params = {
+            "random_id": random.randint(1, 2**32),
+            "message": message.text,
+        }
+        if message.peer_id is not None:
+            params["peer_id"] = message.peer_id
+        else:
+            params["user_id"] = message.user_id
+            params["peer_id"] = "-" + str(self.app.config.bot.group_id)
+        return await self.batcher.submit("messages.send", params)
@@ -0,0 +1,121 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+from app.base.rate_limit import TokenBucket
+
+# VK rejects execute requests with more than 25 API calls
+EXECUTE_MAX_CALLS = 25
+
+Call = tuple[str, dict]
+
+
+class VkApiError(Exception):
+    def __init__(self, method: str, error: Any):
+        super().__init__(f"{method} failed: {error}")
+        self.method = method
+        self.error = error
+
+
+def build_execute_code(calls: list[Call]) -> str:
+    return "return [{}];".format(
+        ",".join(
+            f"API.{method}({json.dumps(params, ensure_ascii=False)})"
+            for method, params in calls
+        )
+    )
+
+
+class ExecuteBatcher:
+    """Collects API calls for up to ``delay`` seconds (or ``max_size`` calls)
+    and sends them with a single ``execute`` request.
+
+    A batch is only cut once the limiter grants a request, so calls keep
+    accumulating while the rate limit is hit instead of queueing up as many
+    small requests.
+    """
+
+    def __init__(
+        self,
+        execute: Callable[[list[Call]], Awaitable[list[Any]]],
+        max_size: int = EXECUTE_MAX_CALLS,
+        delay: float = 0.005,
+        limiter: Optional[TokenBucket] = None,
+    ):
+        self.execute = execute
+        self.limiter = limiter
+        self.acquiring = False
+        self.max_size = min(max_size, EXECUTE_MAX_CALLS)
+        self.delay = delay
+        self.pending: list[tuple[Call, asyncio.Future]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.tasks: set[asyncio.Task] = set()
+
+    def submit(self, method: str, params: dict) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(((method, params), future))
+        self._schedule()
+        return future
+
+    def _schedule(self) -> None:
+        if self.acquiring or not self.pending:
+            return
+        if len(self.pending) >= self.max_size:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(
+                self.delay, self.flush
+            )
+
+    def flush(self) -> None:
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if self.acquiring or not self.pending:
+            return
+        self.acquiring = True
+        self._spawn(self._acquire_and_send())
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _acquire_and_send(self) -> None:
+        try:
+            if self.limiter is not None:
+                await self.limiter.acquire()
+        finally:
+            self.acquiring = False
+        batch = self.pending[:self.max_size]
+        self.pending = self.pending[self.max_size:]
+        self._schedule()
+        await self._send(batch)
+
+    async def close(self) -> None:
+        while self.pending or self.tasks:
+            self.flush()
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def _send(self, batch: list[tuple[Call, asyncio.Future]]) -> None:
+        try:
+            results = await self.execute([call for call, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if not isinstance(results, list) or len(results) != len(batch):
+            for (method, _), future in batch:
+                if not future.done():
+                    future.set_exception(VkApiError(method, results))
+            return
+
+        for ((method, _), future), result in zip(batch, results):
+            if future.done():
+                continue
+            if result is False:
+                future.set_exception(VkApiError(method, result))
+            else:
+                future.set_result(result)
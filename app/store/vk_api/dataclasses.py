@@ -1,20 +1,50 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class UpdateObject:
     id: int
     user_id: int
     body: str
+    peer_id: Optional[int] = None
+    # numbers messages within one chat; ``id`` is 0 for chat messages
+    conversation_message_id: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Update:
     type: str
     object: UpdateObject
+    event_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     user_id: int
     text: str
+    # set for replies to a chat, user_id is used otherwise
+    peer_id: Optional[int] = None
+
+
+def parse_update(raw: dict) -> Update:
+    obj = raw["object"]
+    message = obj.get("message")
+    if message is not None:
+        # API 5.103+ wraps the message: {"message": {...}, "client_info": {...}}
+        return Update(
+            raw["type"],
+            UpdateObject(
+                message["id"],
+                message["from_id"],
+                message["text"],
+                message.get("peer_id"),
+                message.get("conversation_message_id"),
+            ),
+            raw.get("event_id"),
+        )
+    return Update(raw["type"], UpdateObject(obj["id"], obj["user_id"], obj["body"]))
+
+
+def parse_updates(raw_updates: list[dict]) -> list[Update]:
+    return [parse_update(raw) for raw in raw_updates if raw["type"] == "message_new"]
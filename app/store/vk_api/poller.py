@@ -1,25 +1,136 @@
 import asyncio
+import random
+import time
 from asyncio import Task
+from collections import OrderedDict
+from itertools import count
+from logging import getLogger
 from typing import Optional
 
 from app.store import Store
+from app.store.vk_api.dataclasses import Update
 
 
 class Poller:
-    def __init__(self, store: Store):
+    def __init__(
+        self,
+        store: Store,
+        queue_size: int = 100,
+        handlers: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
         self.store = store
         self.is_running = False
         self.poll_task: Optional[Task] = None
+        self.handler_tasks: list[Task] = []
+        self.handlers_count = handlers
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failures = 0
+        self.queue: asyncio.Queue[tuple[int, float, list[Update]]] = asyncio.Queue(
+            maxsize=queue_size
+        )
+        self.logger = getLogger("poller")
+        self.seq = count()
+        # ts of every queued batch by sequence number, True once handled
+        self.in_flight: OrderedDict[int, list] = OrderedDict()
+        self.checkpoint_ts: Optional[str] = None
+        self.saved_ts: Optional[str] = None
+        self.checkpoint_lock = asyncio.Lock()
+        self.batches = 0
+        self.updates = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
 
     async def start(self):
         self.is_running = True
+        self.handler_tasks = [
+            asyncio.create_task(self.handle()) for _ in range(self.handlers_count)
+        ]
         self.poll_task = asyncio.create_task(self.poll())
 
     async def stop(self):
         self.is_running = False
-        await self.poll_task
+        if self.poll_task:
+            # the long poll may hang for its full wait time, nothing is lost
+            # by abandoning it since ts only advances on a response
+            self.poll_task.cancel()
+            await asyncio.gather(self.poll_task, return_exceptions=True)
+        await self.queue.join()
+        for task in self.handler_tasks:
+            task.cancel()
+        await asyncio.gather(*self.handler_tasks, return_exceptions=True)
+        self.handler_tasks = []
+
+    def backoff_delay(self) -> float:
+        # "full jitter": spreads reconnects of several workers over time
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** self.failures)
+        )
 
     async def poll(self):
         while self.is_running:
-            updates = await self.store.vk_api.poll()
-            await self.store.bots_manager.handle_updates(updates)
+            try:
+                updates = await self.store.vk_api.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error("Exception", exc_info=e)
+                await asyncio.sleep(self.backoff_delay())
+                self.failures += 1
+                continue
+            self.failures = 0
+            if updates:
+                seq = next(self.seq)
+                self.in_flight[seq] = [self.store.vk_api.ts, False]
+                await self.queue.put((seq, time.monotonic(), updates))
+
+    async def handle(self):
+        while True:
+            seq, received_at, updates = await self.queue.get()
+            lag = time.monotonic() - received_at
+            self.batches += 1
+            self.updates += len(updates)
+            self.lag_total += lag
+            self.lag_max = max(self.lag_max, lag)
+            try:
+                await self.store.bots_manager.handle_updates(updates)
+            except Exception as e:
+                self.logger.error("Exception", exc_info=e)
+            try:
+                await self.checkpoint(seq)
+            except Exception as e:
+                self.logger.error("Exception", exc_info=e)
+            finally:
+                self.queue.task_done()
+
+    async def checkpoint(self, seq: int):
+        """Saves the ts of the newest batch with no unhandled batches before
+        it, so a restart never skips an update that was not handled."""
+        self.in_flight[seq][1] = True
+        while self.in_flight:
+            first = next(iter(self.in_flight))
+            ts, done = self.in_flight[first]
+            if not done:
+                break
+            self.checkpoint_ts = ts
+            del self.in_flight[first]
+
+        async with self.checkpoint_lock:
+            ts = self.checkpoint_ts
+            if ts is None or ts == self.saved_ts:
+                return
+            await self.store.vk_api.save_ts(ts)
+            self.saved_ts = ts
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.queue.qsize(),
+            "batches": self.batches,
+            "updates": self.updates,
+            "failures": self.failures,
+            "checkpoint_ts": self.saved_ts,
+            "lag_avg_ms": self.lag_total / self.batches * 1000 if self.batches else 0.0,
+            "lag_max_ms": self.lag_max * 1000,
+        }
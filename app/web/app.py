@@ -6,8 +6,7 @@ from aiohttp.web import (
     View as AiohttpView,
 )
 from aiohttp_apispec import setup_aiohttp_apispec
-from aiohttp_session import setup as session_setup
-from aiohttp_session.cookie_storage import EncryptedCookieStorage
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.admin.models import Admin
 from app.store import Store, setup_store
@@ -16,6 +15,7 @@ from app.web.config import Config, setup_config
 from app.web.logger import setup_logging
 from app.web.middlewares import setup_middlewares
 from app.web.routes import setup_routes
+from app.web.sessions import setup_sessions
 
 
 class Application(AiohttpApplication):
@@ -41,6 +41,10 @@ class View(AiohttpView):
     def database(self):
         return self.request.app.database
 
+    @property
+    def db_session(self) -> Optional[AsyncSession]:
+        return self.request.get("db_session")
+
     @property
     def store(self) -> Store:
         return self.request.app.store
@@ -56,7 +60,7 @@ app = Application()
 def setup_app(config_path: str) -> Application:
     setup_logging(app)
     setup_config(app, config_path)
-    session_setup(app, EncryptedCookieStorage(app.config.session.key))
+    setup_sessions(app)
     setup_routes(app)
     setup_aiohttp_apispec(
         app, title="Vk Quiz Bot", url="/docs/json", swagger_path="/docs"
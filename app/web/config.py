@@ -10,6 +10,14 @@ if typing.TYPE_CHECKING:
 @dataclass
 class SessionConfig:
     key: str
+    storage: str = "memory"
+    max_age: int = 86400
+    max_size: int = 100_000
+    cleanup_interval: float = 60.0
+    cleanup_batch_size: int = 1000
+    # how long a worker may serve a Postgres session from memory; a logout
+    # on another worker takes up to this long to be seen here
+    cache_ttl: float = 5.0
 
 
 @dataclass
@@ -18,10 +26,47 @@ class AdminConfig:
     password: str
 
 
+@dataclass
+class PasswordConfig:
+    algorithm: str = "scrypt"
+    scrypt_n: int = 2 ** 14
+    scrypt_r: int = 8
+    scrypt_p: int = 1
+    pbkdf2_iterations: int = 600_000
+    workers: int = 4
+
+
 @dataclass
 class BotConfig:
     token: str
     group_id: int
+    api_url: str = "https://api.vk.com/method/"
+    # "polling" runs the long-poll loop, "callback" takes events on /vk.callback
+    mode: str = "polling"
+    confirmation_code: str = ""
+    secret: str = ""
+    limit_per_host: int = 10
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int = 300
+    connect_timeout: float = 5.0
+    poll_wait: int = 30
+    poll_timeout: float = 40.0
+    send_timeout: float = 10.0
+    batch_size: int = 25
+    batch_delay: float = 0.005
+    rate_limit: float = 20.0
+    send_workers: int = 25
+    outbound_queue_size: int = 1000
+    handler_concurrency: int = 100
+    poll_queue_size: int = 100
+    poll_handlers: int = 4
+    poll_backoff_base: float = 0.5
+    poll_backoff_max: float = 30.0
+    dedup_size: int = 100_000
+    dedup_persistent: bool = False
+    dedup_retention: int = 86400
+    dedup_cleanup_interval: float = 300.0
+    dedup_cleanup_batch_size: int = 1000
 
 
 @dataclass
@@ -31,6 +76,26 @@ class DatabaseConfig:
     user: str = "postgres"
     password: str = "postgres"
     database: str = "project"
+    echo: bool = False
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100
+    listen: bool = True
+
+
+@dataclass
+class GameConfig:
+    flush_interval: float = 1.0
+
+
+@dataclass
+class CacheConfig:
+    max_size: int = 1024
+    ttl: float = 60.0
+    admin_ttl: float = 30.0
 
 
 @dataclass
@@ -39,6 +104,9 @@ class Config:
     session: SessionConfig = None
     bot: BotConfig = None
     database: DatabaseConfig = None
+    cache: CacheConfig = None
+    password: PasswordConfig = None
+    game: GameConfig = None
 
 
 def setup_config(app: "Application", config_path: str):
@@ -46,16 +114,14 @@ def setup_config(app: "Application", config_path: str):
         raw_config = yaml.safe_load(f)
 
     app.config = Config(
-        session=SessionConfig(
-            key=raw_config["session"]["key"],
-        ),
+        session=SessionConfig(**raw_config["session"]),
         admin=AdminConfig(
             email=raw_config["admin"]["email"],
             password=raw_config["admin"]["password"],
         ),
-        bot=BotConfig(
-            token=raw_config["bot"]["token"],
-            group_id=raw_config["bot"]["group_id"],
-        ),
+        bot=BotConfig(**raw_config["bot"]),
         database=DatabaseConfig(**raw_config["database"]),
+        cache=CacheConfig(**raw_config.get("cache", {})),
+        password=PasswordConfig(**raw_config.get("password", {})),
+        game=GameConfig(**raw_config.get("game", {})),
     )
@@ -18,6 +18,7 @@ async def auth_middleware(request: "Request", handler: callable):
     session = await get_session(request)
     if session:
         request.admin = Admin.from_session(session)
+        request["admin_identity"] = await request.app.store.admins.get_identity(request.admin.email)
     return await handler(request)
 
 
@@ -57,7 +58,17 @@ async def error_handling_middleware(request: "Request", handler):
         )
 
 
+@middleware
+async def database_session_middleware(request: "Request", handler):
+    async with request.app.database.transaction() as session:
+        request["db_session"] = session
+        return await handler(request)
+
+
 def setup_middlewares(app: "Application"):
-    app.middlewares.append(auth_middleware)
     app.middlewares.append(error_handling_middleware)
+    app.middlewares.append(database_session_middleware)
+    # inside both: a failed identity lookup gets the JSON error envelope
+    # and runs in the request transaction
+    app.middlewares.append(auth_middleware)
     app.middlewares.append(validation_middleware)
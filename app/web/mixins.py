@@ -1,6 +1,5 @@
 from aiohttp.abc import StreamResponse
 from aiohttp.web_exceptions import HTTPUnauthorized, HTTPForbidden
-from aiohttp_session import get_session
 
 
 class AuthRequiredMixin:
@@ -10,12 +9,10 @@ class AuthRequiredMixin:
         return await super(AuthRequiredMixin, self)._iter()
 
     async def _check_user_authorization(self):
-        session = await get_session(self.request)
-        if session is None:
+        if getattr(self.request, "admin", None) is None:
             raise HTTPUnauthorized
 
     async def _check_correct_user_email(self):
-        session = await get_session(self.request)
-        user = await self.store.admins.get_by_email(session['admin']['email'])
-        if not user or session['admin']['email'] != user.email:
+        user = self.request.get("admin_identity")
+        if not user or self.request.admin.email != user.email or self.request.admin.id != user.id:
             raise HTTPForbidden
@@ -1,6 +1,21 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, ValidationError, fields, validate
+
+from app.web.utils import decode_cursor
 
 
 class OkResponseSchema(Schema):
     status = fields.Str()
     data = fields.Dict()
+
+
+class CursorField(fields.Str):
+    def _deserialize(self, value, attr, data, **kwargs) -> int:
+        try:
+            return decode_cursor(super()._deserialize(value, attr, data, **kwargs))
+        except ValueError as e:
+            raise ValidationError("Invalid cursor.") from e
+
+
+class PaginationSchema(Schema):
+    limit = fields.Int(validate=validate.Range(min=1, max=1000))
+    cursor = CursorField()
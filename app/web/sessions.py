@@ -0,0 +1,60 @@
+import secrets
+import typing
+
+from aiohttp import web
+from aiohttp_session import AbstractStorage, Session, setup as session_setup
+from aiohttp_session.cookie_storage import EncryptedCookieStorage
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+SESSION_KEY_BYTES = 16
+
+
+class ServerSideStorage(AbstractStorage):
+    """Keeps session data in ``app.store.sessions`` and only a short opaque
+    id in the cookie."""
+
+    def __init__(self, app: "Application", *, max_age: int, **kwargs) -> None:
+        super().__init__(max_age=max_age, **kwargs)
+        self.app = app
+
+    async def load_session(self, request: web.Request) -> Session:
+        key = self.load_cookie(request)
+        if key is None:
+            return Session(None, data=None, new=True, max_age=self.max_age)
+
+        data = await self.app.store.sessions.load(key)
+        if data is None:
+            return Session(None, data=None, new=True, max_age=self.max_age)
+        try:
+            data = self._decoder(data)
+        except ValueError:
+            data = None
+        return Session(key, data=data, new=False, max_age=self.max_age)
+
+    async def save_session(
+        self, request: web.Request, response: web.StreamResponse, session: Session
+    ) -> None:
+        key = session.identity
+        if session.empty:
+            if key is not None:
+                await self.app.store.sessions.delete(key)
+            self.save_cookie(response, "", max_age=session.max_age)
+            return
+
+        if key is None:
+            key = secrets.token_urlsafe(SESSION_KEY_BYTES)
+        await self.app.store.sessions.save(
+            key, self._encoder(self._get_session_data(session)), session.max_age or self.max_age
+        )
+        self.save_cookie(response, key, max_age=session.max_age)
+
+
+def setup_sessions(app: "Application") -> None:
+    config = app.config.session
+    if config.storage == "cookie":
+        storage = EncryptedCookieStorage(config.key, max_age=config.max_age)
+    else:
+        storage = ServerSideStorage(app, max_age=config.max_age)
+    session_setup(app, storage)
@@ -1,4 +1,6 @@
-from typing import Any, Optional
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any, Optional, Sequence
 
 from aiohttp.web import json_response as aiohttp_json_response
 from aiohttp.web_response import Response
@@ -31,3 +33,25 @@ def error_json_response(
             "data": data,
         },
     )
+
+
+def encode_cursor(last_id: int) -> str:
+    return urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        last_id = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))["id"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(last_id, int):
+        raise ValueError("invalid cursor")
+    return last_id
+
+
+def paginate(items: Sequence, limit: Optional[int]) -> tuple[Sequence, Optional[str]]:
+    """Trim a page fetched with ``limit + 1`` rows and build its next cursor."""
+    if limit is None or len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(items[-1].id)
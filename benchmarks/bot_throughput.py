@@ -0,0 +1,83 @@
+"""End-to-end bot throughput against the fake VK API.
+
+Starts the application (database, VkApiAccessor, Poller, BotManager) with
+bot.api_url pointing at benchmarks.fake_vk, feeds it synthetic updates and
+reports updates/s and update-to-reply latency. Needs the database from the
+given config. Usage:
+
+    python -m benchmarks.bot_throughput [--config tests/config.yml] \
+        [--rate 500] [--duration 10] [--rate-limit 0]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+from dataclasses import replace
+
+from aiohttp import web
+
+from app.web.app import setup_app
+from benchmarks.fake_vk import FakeVk
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def main(args: argparse.Namespace) -> None:
+    fake = FakeVk(rate=args.rate, users=args.users, send_latency=args.send_latency)
+    await fake.start()
+
+    app = setup_app(config_path=os.path.abspath(args.config))
+    bot = replace(app.config.bot, api_url=fake.url + "/method/", mode="polling")
+    if args.rate_limit is not None:
+        bot = replace(bot, rate_limit=args.rate_limit)
+    app.config.bot = bot
+    app.store.vk_api.limiter.rate = bot.rate_limit
+    logging.getLogger().setLevel(logging.WARNING)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    try:
+        fake.start_emitting()
+        started = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        fake.stop_emitting()
+
+        deadline = time.perf_counter() + args.drain_timeout
+        while fake.replied < fake.emitted and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+        await fake.stop()
+
+    latencies = fake.latencies
+    print(f"updates emitted {fake.emitted}, replied {fake.replied} in {elapsed:.1f}s")
+    print(f"throughput: {fake.replied / elapsed:.0f} updates/s")
+    if latencies:
+        print(
+            "latency ms: "
+            f"p50 {percentile(latencies, 0.5) * 1000:.1f}, "
+            f"p99 {percentile(latencies, 0.99) * 1000:.1f}, "
+            f"mean {statistics.mean(latencies) * 1000:.1f}"
+        )
+    print("requests: " + ", ".join(f"{k} {v}" for k, v in sorted(fake.requests.items())))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config.yml")
+    parser.add_argument("--rate", type=float, default=500)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--drain-timeout", type=float, default=10)
+    parser.add_argument("--send-latency", type=float, default=0.0)
+    parser.add_argument(
+        "--rate-limit", type=float, default=None,
+        help="override bot.rate_limit, 0 disables the limiter",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,164 @@
+"""Local stand-in for the parts of the VK API the bot uses.
+
+Serves groups.getLongPollServer, the long-poll endpoint, messages.send and
+execute. Emits synthetic message_new updates at a fixed rate and records
+how long each one waited for its reply. Replies are matched to updates per
+user in order, which the bot guarantees. Can also run on its own:
+
+    python -m benchmarks.fake_vk [--port 8081] [--rate 500] [--users 100]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict, deque
+from typing import Optional
+
+from aiohttp import web
+
+SEND_CALL = "API.messages.send("
+
+
+class FakeVk:
+    def __init__(self, rate: float = 500, users: int = 100, send_latency: float = 0.0):
+        self.rate = rate
+        self.users = users
+        self.send_latency = send_latency
+        # ids and ts start from the clock so a persisted ts or dedup table
+        # from an earlier run never matches this one
+        self.first_ts = int(time.time() * 1000)
+        self.events: list[dict] = []
+        self.new_events = asyncio.Condition()
+        self.waiting: dict[int, deque[float]] = defaultdict(deque)
+        self.latencies: list[float] = []
+        self.requests: dict[str, int] = defaultdict(int)
+        self.generator: Optional[asyncio.Task] = None
+        self.app = web.Application()
+        self.app.router.add_get("/method/groups.getLongPollServer", self.get_long_poll_server)
+        self.app.router.add_post("/method/messages.send", self.messages_send)
+        self.app.router.add_post("/method/execute", self.execute)
+        self.app.router.add_get("/lp", self.long_poll)
+        self.runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    @property
+    def ts(self) -> int:
+        return self.first_ts + len(self.events)
+
+    @property
+    def emitted(self) -> int:
+        return len(self.events)
+
+    @property
+    def replied(self) -> int:
+        return len(self.latencies)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        self.stop_emitting()
+        if self.runner:
+            await self.runner.cleanup()
+
+    def start_emitting(self) -> None:
+        self.generator = asyncio.create_task(self._emit())
+
+    def stop_emitting(self) -> None:
+        if self.generator:
+            self.generator.cancel()
+            self.generator = None
+
+    async def _emit(self) -> None:
+        tick = 0.01
+        started = time.perf_counter()
+        while True:
+            await asyncio.sleep(tick)
+            due = int((time.perf_counter() - started) * self.rate) - self.emitted
+            if due <= 0:
+                continue
+            now = time.perf_counter()
+            for _ in range(due):
+                user_id = random.randint(1, self.users)
+                self.events.append(
+                    {
+                        "type": "message_new",
+                        "object": {"id": self.ts, "user_id": user_id, "body": "hi"},
+                    }
+                )
+                self.waiting[user_id].append(now)
+            async with self.new_events:
+                self.new_events.notify_all()
+
+    def _reply(self, params: dict) -> int:
+        queue = self.waiting.get(int(params["user_id"]))
+        if queue:
+            self.latencies.append(time.perf_counter() - queue.popleft())
+        return random.randint(1, 2**31)
+
+    async def get_long_poll_server(self, request: web.Request) -> web.Response:
+        self.requests["groups.getLongPollServer"] += 1
+        return web.json_response(
+            {"response": {"key": "key", "server": self.url + "/lp", "ts": str(self.ts)}}
+        )
+
+    async def long_poll(self, request: web.Request) -> web.Response:
+        self.requests["a_check"] += 1
+        ts = int(request.query["ts"])
+        if not self.first_ts <= ts <= self.ts:
+            return web.json_response({"failed": 1, "ts": str(self.ts)})
+        if ts == self.ts:
+            try:
+                async with self.new_events:
+                    await asyncio.wait_for(
+                        self.new_events.wait(), timeout=float(request.query.get("wait", 25))
+                    )
+            except asyncio.TimeoutError:
+                pass
+        updates = self.events[ts - self.first_ts:]
+        return web.json_response({"ts": str(ts + len(updates)), "updates": updates})
+
+    async def messages_send(self, request: web.Request) -> web.Response:
+        self.requests["messages.send"] += 1
+        params = await request.post()
+        await asyncio.sleep(self.send_latency)
+        return web.json_response({"response": self._reply(params)})
+
+    async def execute(self, request: web.Request) -> web.Response:
+        self.requests["execute"] += 1
+        code = (await request.post())["code"]
+        decoder = json.JSONDecoder()
+        results = []
+        for call in code.split(SEND_CALL)[1:]:
+            params, _ = decoder.raw_decode(call)
+            results.append(self._reply(params))
+        await asyncio.sleep(self.send_latency)
+        return web.json_response({"response": results})
+
+
+async def main(args: argparse.Namespace) -> None:
+    fake = FakeVk(rate=args.rate, users=args.users, send_latency=args.send_latency)
+    await fake.start(port=args.port)
+    fake.start_emitting()
+    print(f"fake VK API on {fake.url}/method/")
+    try:
+        while True:
+            await asyncio.sleep(5)
+            print(f"emitted {fake.emitted}, replied {fake.replied}")
+    finally:
+        await fake.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--rate", type=float, default=500)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--send-latency", type=float, default=0.0)
+    asyncio.run(main(parser.parse_args()))
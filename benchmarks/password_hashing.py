@@ -0,0 +1,70 @@
+"""Event-loop latency during a login storm.
+
+Runs N concurrent password verifications either inline on the event loop
+or through PasswordHasher's executor, while a ticker measures how late the
+loop wakes it up. Usage:
+
+    python -m benchmarks.password_hashing [--logins 200] [--scrypt-n 16384]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.store.admin.hasher import PasswordHasher, check_password
+from app.web.config import PasswordConfig
+
+TICK = 0.005
+
+
+async def ticker(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def storm(hasher: PasswordHasher, hashed: str, logins: int, inline: bool) -> dict:
+    async def login():
+        if inline:
+            return check_password("secret", hashed)
+        return await hasher.verify("secret", hashed)
+
+    lags = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(TICK * 2)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await tick_task
+    assert all(results)
+    lags.sort()
+    return {
+        "logins/s": logins / elapsed,
+        "lag p50 ms": statistics.median(lags) * 1000,
+        "lag p99 ms": lags[int(len(lags) * 0.99) - 1] * 1000 if len(lags) > 1 else lags[0] * 1000,
+        "lag max ms": lags[-1] * 1000,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    hasher = PasswordHasher(
+        PasswordConfig(algorithm="scrypt", scrypt_n=args.scrypt_n, workers=args.workers)
+    )
+    hashed = hasher.hash_sync("secret")
+    for name, inline in (("inline", True), ("executor", False)):
+        result = await storm(hasher, hashed, args.logins, inline)
+        print(f"{name:>8}: " + ", ".join(f"{key} {value:.1f}" for key, value in result.items()))
+    hasher.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--scrypt-n", type=int, default=2 ** 14)
+    parser.add_argument("--workers", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,95 @@
+"""Per-request cost of loading a session.
+
+Loads the same admin session repeatedly through EncryptedCookieStorage
+(Fernet decrypt of the whole session in the cookie) and ServerSideStorage
+backed by the in-process store (opaque id lookup). With --config, also
+through the Postgres store, once with its in-process cache disabled and
+once with it on. Times are wall clock, so the Postgres rows include the
+round trip. Usage:
+
+    python -m benchmarks.session_storage [--requests 20000] [--config config.yml]
+"""
+import argparse
+import asyncio
+import os
+import time
+from dataclasses import replace
+from types import SimpleNamespace
+
+from aiohttp.test_utils import make_mocked_request
+from aiohttp_session import Session
+from aiohttp_session.cookie_storage import EncryptedCookieStorage
+from cryptography import fernet
+
+from app.store.database.database import Database
+from app.store.session.accessor import MemorySessionAccessor, PostgresSessionAccessor
+from app.web.config import SessionConfig, setup_config
+from app.web.sessions import ServerSideStorage
+
+SESSION = {"admin": {"id": 1, "email": "admin@admin.com"}}
+
+
+async def run(storage, cookie: str, requests: int) -> float:
+    request = make_mocked_request("GET", "/", headers={"Cookie": f"AIOHTTP_SESSION={cookie}"})
+    started = time.perf_counter()
+    for _ in range(requests):
+        session = await storage.load_session(request)
+        assert session["admin"]["id"] == 1
+    return (time.perf_counter() - started) / requests
+
+
+async def main(args: argparse.Namespace) -> None:
+    key = fernet.Fernet.generate_key()
+    config = SessionConfig(key=key.decode(), max_age=3600)
+    session = Session(None, data=None, new=True)
+    session.update(SESSION)
+
+    cookie_storage = EncryptedCookieStorage(config.key, max_age=config.max_age)
+    cookie = cookie_storage._fernet.encrypt(
+        cookie_storage._encoder(cookie_storage._get_session_data(session)).encode()
+    ).decode()
+
+    app = SimpleNamespace(config=SimpleNamespace(session=config), on_startup=[], on_cleanup=[])
+    app.store = SimpleNamespace(sessions=MemorySessionAccessor(app))
+    server_storage = ServerSideStorage(app, max_age=config.max_age)
+    data = server_storage._encoder(server_storage._get_session_data(session))
+    await app.store.sessions.save("opaque-id", data, config.max_age)
+
+    for name, storage, value in (
+        ("cookie", cookie_storage, cookie),
+        ("memory", server_storage, "opaque-id"),
+    ):
+        await report(name, storage, value, args.requests)
+
+    if args.config:
+        await run_postgres(args, data)
+
+
+async def run_postgres(args: argparse.Namespace, data: str) -> None:
+    app = SimpleNamespace(on_startup=[], on_cleanup=[])
+    setup_config(app, os.path.abspath(args.config))
+    app.config.database = replace(app.config.database, listen=False)
+    app.database = Database(app)
+    await app.database.connect()
+    try:
+        for name, cache_ttl in (("pg", 0.0), ("pg+cache", app.config.session.cache_ttl)):
+            app.config.session = replace(app.config.session, cache_ttl=cache_ttl)
+            app.store = SimpleNamespace(sessions=PostgresSessionAccessor(app))
+            storage = ServerSideStorage(app, max_age=app.config.session.max_age)
+            await app.store.sessions.save("benchmark-id", data, app.config.session.max_age)
+            await report(name, storage, "benchmark-id", args.requests)
+        await app.store.sessions.delete("benchmark-id")
+    finally:
+        await app.database.disconnect()
+
+
+async def report(name: str, storage, cookie: str, requests: int) -> None:
+    per_request = await run(storage, cookie, requests)
+    print(f"{name:>8}: {per_request * 1e6:.1f} us/request, cookie {len(cookie)} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--config", help="also benchmark the Postgres store of this config")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,117 @@
+"""Decoding long-poll responses into Update objects.
+
+Times a 1000-update a_check response through the previous path (stdlib
+json, field-by-field dict dataclasses) and the current one (optional
+orjson, slots dataclasses, parse_updates). Usage:
+
+    python -m benchmarks.update_decoding [--updates 1000] [--rounds 200]
+"""
+import argparse
+import json
+import time
+from dataclasses import dataclass
+
+from app.base import serialization
+from app.store.vk_api.dataclasses import parse_updates
+
+
+@dataclass
+class LegacyUpdateObject:
+    id: int
+    user_id: int
+    body: str
+
+
+@dataclass
+class LegacyUpdate:
+    type: str
+    object: LegacyUpdateObject
+
+
+def legacy_decode(payload: bytes) -> list[LegacyUpdate]:
+    data = json.loads(payload)
+    updates = []
+    for update in data.get("updates", []):
+        message = update["object"]["message"]
+        updates.append(
+            LegacyUpdate(
+                type=update["type"],
+                object=LegacyUpdateObject(
+                    id=message["id"],
+                    user_id=message["from_id"],
+                    body=message["text"],
+                ),
+            )
+        )
+    return updates
+
+
+def current_decode(payload: bytes):
+    return parse_updates(serialization.loads(payload).get("updates", []))
+
+
+def make_payload(count: int) -> bytes:
+    updates = [
+        {
+            "type": "message_new",
+            "event_id": f"{i:040x}",
+            "v": "5.131",
+            "object": {
+                "message": {
+                    "date": 1666000000 + i,
+                    "from_id": i % 500 + 1,
+                    "id": i,
+                    "out": 0,
+                    "peer_id": i % 500 + 1,
+                    "text": "Ответ на вопрос номер " + str(i),
+                    "conversation_message_id": i,
+                    "fwd_messages": [],
+                    "important": False,
+                    "random_id": 0,
+                    "attachments": [],
+                    "is_hidden": False,
+                },
+                "client_info": {
+                    "button_actions": ["text", "vkpay", "open_app", "location"],
+                    "keyboard": True,
+                    "inline_keyboard": True,
+                    "carousel": True,
+                    "lang_id": 0,
+                },
+            },
+            "group_id": 1,
+        }
+        for i in range(1, count + 1)
+    ]
+    return json.dumps({"ts": "1000", "updates": updates}, ensure_ascii=False).encode()
+
+
+def bench(decode, payload: bytes, rounds: int) -> float:
+    decode(payload)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        decode(payload)
+    return (time.perf_counter() - started) / rounds
+
+
+def main(args: argparse.Namespace) -> None:
+    payload = make_payload(args.updates)
+    print(f"{args.updates} updates, {len(payload) / 1024:.0f} KiB payload")
+    results = [("legacy", bench(legacy_decode, payload, args.rounds))]
+    if serialization.orjson is not None:
+        orjson = serialization.orjson
+        serialization.orjson = None
+        results.append(("current, stdlib json", bench(current_decode, payload, args.rounds)))
+        serialization.orjson = orjson
+        results.append(("current, orjson", bench(current_decode, payload, args.rounds)))
+    else:
+        results.append(("current, stdlib json", bench(current_decode, payload, args.rounds)))
+    for name, per_batch in results:
+        print(f"{name:>22}: {per_batch * 1000:.2f} ms/batch")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=200)
+    main(parser.parse_args())
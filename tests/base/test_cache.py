@@ -0,0 +1,57 @@
+from app.base import cache
+from app.base.cache import TTLCache
+
+
+class TestTTLCache:
+    def test_get_set(self):
+        ttl_cache = TTLCache(max_size=2, ttl=10)
+        assert ttl_cache.get("a") is None
+        ttl_cache.set("a", 1)
+        assert ttl_cache.get("a") == 1
+        assert ttl_cache.stats()["hits"] == 1
+        assert ttl_cache.stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        ttl_cache = TTLCache(max_size=2, ttl=10)
+        ttl_cache.set("a", 1)
+        ttl_cache.set("b", 2)
+        ttl_cache.get("a")
+        ttl_cache.set("c", 3)
+        assert "a" in ttl_cache
+        assert "b" not in ttl_cache
+        assert "c" in ttl_cache
+        assert len(ttl_cache) == 2
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = 100.0
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now)
+        ttl_cache = TTLCache(max_size=2, ttl=10)
+        ttl_cache.set("a", 1)
+        now = 109.0
+        assert ttl_cache.get("a") == 1
+        now = 111.0
+        assert ttl_cache.get("a") is None
+        assert len(ttl_cache) == 0
+
+    def test_invalidate(self):
+        ttl_cache = TTLCache(max_size=10, ttl=10)
+        ttl_cache.set((1, None), "a")
+        ttl_cache.set((2, None), "b")
+        ttl_cache.invalidate(lambda key: key[0] == 1)
+        assert (1, None) not in ttl_cache
+        assert (2, None) in ttl_cache
+
+    def test_disabled(self):
+        ttl_cache = TTLCache(max_size=10, ttl=0)
+        ttl_cache.set("a", 1)
+        assert ttl_cache.get("a") is None
+
+    def test_set_skipped_after_invalidation(self):
+        ttl_cache = TTLCache(max_size=10, ttl=10)
+        generation = ttl_cache.generation
+        ttl_cache.pop("a")
+        ttl_cache.set("a", "stale", generation=generation)
+        assert "a" not in ttl_cache
+
+        ttl_cache.set("a", "fresh", generation=ttl_cache.generation)
+        assert ttl_cache.get("a") == "fresh"
@@ -0,0 +1,24 @@
+import time
+
+from app.base.rate_limit import TokenBucket
+
+
+class TestTokenBucket:
+    async def test_burst_up_to_capacity(self):
+        bucket = TokenBucket(rate=10)
+        started = time.monotonic()
+        for _ in range(10):
+            await bucket.acquire()
+        assert time.monotonic() - started < 0.05
+
+    async def test_limits_rate(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+        started = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        assert time.monotonic() - started >= 0.045
+
+    async def test_disabled(self):
+        bucket = TokenBucket(rate=0)
+        for _ in range(1000):
+            await bucket.acquire()
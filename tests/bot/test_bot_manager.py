@@ -1,3 +1,5 @@
+import asyncio
+
 from app.store.vk_api.dataclasses import Message, Update, UpdateObject
 
 
@@ -19,7 +21,66 @@ class TestHandleUpdates:
                 )
             ]
         )
+        await store.bots_manager.outbound.join()
         assert store.vk_api.send_message.call_count == 1
         message: Message = store.vk_api.send_message.mock_calls[0].args[0]
         assert message.user_id == 1
         assert message.text
+
+
+def make_update(user_id: int, id_: int) -> Update:
+    return Update(
+        type="message_new",
+        object=UpdateObject(id=id_, user_id=user_id, body="kek"),
+    )
+
+
+class TestConcurrentDispatch:
+    async def test_slow_user_does_not_block_others(self, store, monkeypatch):
+        handled = []
+        release = asyncio.Event()
+
+        async def handle_update(update: Update):
+            if update.object.user_id == 1:
+                await release.wait()
+            handled.append(update.object.id)
+
+        monkeypatch.setattr(store.bots_manager, "handle_update", handle_update)
+        task = asyncio.create_task(
+            store.bots_manager.handle_updates(
+                [make_update(1, 1), make_update(2, 2), make_update(3, 3)]
+            )
+        )
+        await asyncio.sleep(0.01)
+        assert handled == [2, 3]
+
+        release.set()
+        await task
+        assert handled == [2, 3, 1]
+
+    async def test_per_user_order_across_batches(self, store, monkeypatch):
+        handled = []
+
+        async def handle_update(update: Update):
+            await asyncio.sleep(0.01 if update.object.id == 1 else 0)
+            handled.append(update.object.id)
+
+        monkeypatch.setattr(store.bots_manager, "handle_update", handle_update)
+        await asyncio.gather(
+            store.bots_manager.handle_updates([make_update(1, 1), make_update(1, 2)]),
+            store.bots_manager.handle_updates([make_update(1, 3)]),
+        )
+        assert handled == [1, 2, 3]
+        assert store.bots_manager.peer_tails == {}
+
+    async def test_failed_update_does_not_stop_user(self, store, monkeypatch):
+        handled = []
+
+        async def handle_update(update: Update):
+            if update.object.id == 1:
+                raise RuntimeError
+            handled.append(update.object.id)
+
+        monkeypatch.setattr(store.bots_manager, "handle_update", handle_update)
+        await store.bots_manager.handle_updates([make_update(1, 1), make_update(1, 2)])
+        assert handled == [2]
@@ -0,0 +1,72 @@
+import asyncio
+from dataclasses import replace
+
+
+def event(type_: str = "message_new", **fields) -> dict:
+    return {
+        "type": type_,
+        "group_id": 1,
+        "secret": "s3cr3t",
+        "object": {"id": 1, "user_id": 7, "body": "hi"},
+        **fields,
+    }
+
+
+class TestVkCallbackView:
+    async def test_confirmation(self, cli):
+        resp = await cli.post("/vk.callback", json={"type": "confirmation", "group_id": 1})
+        assert resp.status == 200
+        assert await resp.text() == "abc123"
+
+    async def test_wrong_group(self, cli):
+        resp = await cli.post("/vk.callback", json={"type": "confirmation", "group_id": 2})
+        assert resp.status == 403
+
+    async def test_wrong_secret(self, cli, store):
+        store.vk_api.send_message.reset_mock()
+        resp = await cli.post("/vk.callback", json=event(secret="nope"))
+        assert resp.status == 403
+        await store.bots_manager.join_pending()
+        await store.bots_manager.outbound.join()
+        assert store.vk_api.send_message.called is False
+
+    async def test_bad_request(self, cli):
+        resp = await cli.post("/vk.callback", data="not json")
+        assert resp.status == 400
+
+    async def test_message_is_handled_once(self, cli, store):
+        store.vk_api.send_message.reset_mock()
+        for _ in range(2):
+            resp = await cli.post("/vk.callback", json=event())
+            assert resp.status == 200
+            assert await resp.text() == "ok"
+
+        await store.bots_manager.join_pending()
+        await store.bots_manager.outbound.join()
+        assert store.vk_api.send_message.call_count == 1
+        assert store.vk_api.send_message.mock_calls[0].args[0].user_id == 7
+
+    async def test_other_events_are_acknowledged(self, cli, store):
+        resp = await cli.post("/vk.callback", json=event("group_join"))
+        assert await resp.text() == "ok"
+
+    async def test_disabled_in_polling_mode(self, cli, monkeypatch):
+        config = cli.app.config
+        monkeypatch.setattr(config, "bot", replace(config.bot, mode="polling"))
+        resp = await cli.post("/vk.callback", json=event())
+        assert resp.status == 404
+
+    async def test_acknowledged_before_handling(self, cli, store, monkeypatch):
+        release = asyncio.Event()
+
+        async def handle_updates(updates):
+            await release.wait()
+
+        monkeypatch.setattr(store.bots_manager, "handle_updates", handle_updates)
+        resp = await cli.post("/vk.callback", json=event())
+        assert await resp.text() == "ok"
+        assert len(store.bots_manager.pending) == 1
+
+        release.set()
+        await store.bots_manager.join_pending()
+        assert store.bots_manager.pending == set()
@@ -0,0 +1,134 @@
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import select, update
+
+from app.bot.models import ProcessedUpdateModel
+from app.store.bot.dedup import UpdateDeduplicator, update_key
+from app.store.vk_api.dataclasses import Update, UpdateObject, parse_update
+
+
+def make_update(id_: int, user_id: int | None = None) -> Update:
+    return Update(
+        type="message_new",
+        object=UpdateObject(id=id_, user_id=user_id or id_, body=""),
+    )
+
+
+def make_chat_update(conversation_message_id: int, event_id: str | None = None) -> Update:
+    # VK sends id 0 for every message in a chat
+    return parse_update({
+        "type": "message_new",
+        "event_id": event_id,
+        "object": {
+            "message": {
+                "id": 0,
+                "from_id": 1,
+                "peer_id": 2000000001,
+                "conversation_message_id": conversation_message_id,
+                "text": "",
+            },
+        },
+    })
+
+
+def make_dedup(cli, **bot) -> UpdateDeduplicator:
+    config = cli.app.config
+    app = SimpleNamespace(
+        config=replace(config, bot=replace(config.bot, **bot)),
+        database=cli.app.database,
+    )
+    return UpdateDeduplicator(app)
+
+
+class TestUpdateDeduplicator:
+    async def test_drops_seen_updates(self, cli):
+        dedup = make_dedup(cli)
+        fresh = dedup.filter([make_update(1), make_update(2), make_update(1)])
+        assert [u.object.id for u in fresh] == [1, 2]
+
+        fresh = dedup.filter([make_update(2), make_update(3)])
+        assert [u.object.id for u in fresh] == [3]
+        assert dedup.stats() == {"size": 3, "duplicates": 2}
+
+    async def test_memory_is_bounded(self, cli):
+        dedup = make_dedup(cli, dedup_size=2)
+        dedup.filter([make_update(i) for i in range(1, 4)])
+        assert list(dedup.seen) == ["2", "3"]
+        # the evicted id is let through again
+        assert len(dedup.filter([make_update(1)])) == 1
+
+    async def test_chat_messages_with_zero_id(self, cli):
+        dedup = make_dedup(cli)
+        fresh = dedup.filter([make_chat_update(1), make_chat_update(2), make_chat_update(1)])
+        assert [u.object.conversation_message_id for u in fresh] == [1, 2]
+        assert [update_key(u) for u in fresh] == ["2000000001:1", "2000000001:2"]
+
+    async def test_event_id_is_preferred(self, cli):
+        assert update_key(make_chat_update(1, event_id="abc")) == "abc"
+
+    async def test_persistent_across_restarts(self, cli):
+        dedup = make_dedup(cli, dedup_persistent=True)
+        fresh = dedup.filter([make_update(1), make_update(2)])
+        await dedup.mark_processed(fresh)
+
+        restarted = make_dedup(cli, dedup_persistent=True)
+        updates = restarted.filter([make_update(1), make_update(2), make_update(3)])
+        fresh = restarted.exclude(updates, await restarted.processed(updates))
+        assert [u.object.id for u in fresh] == [3]
+        assert restarted.stats()["duplicates"] == 2
+
+    async def test_delete_expired(self, cli):
+        dedup = make_dedup(cli, dedup_persistent=True, dedup_retention=60)
+        await dedup.mark_processed([make_update(i) for i in range(1, 4)])
+        async with cli.app.database.transaction() as session:
+            await session.execute(
+                update(ProcessedUpdateModel)
+                .where(ProcessedUpdateModel.update_key < "3")
+                .values(processed_at=datetime.now(timezone.utc) - timedelta(hours=1))
+            )
+
+        assert await dedup.delete_expired(10) == 2
+        async with cli.app.database.transaction() as session:
+            keys = (await session.scalars(select(ProcessedUpdateModel.update_key))).all()
+        assert keys == ["3"]
+
+
+class TestHandleDuplicates:
+    async def test_replayed_update_is_answered_once(self, store):
+        store.vk_api.send_message.reset_mock()
+        await store.bots_manager.handle_updates([make_update(1)])
+        await store.bots_manager.handle_updates([make_update(1)])
+        await store.bots_manager.outbound.join()
+        assert store.vk_api.send_message.call_count == 1
+
+    async def test_chat_messages_are_all_answered(self, store):
+        store.vk_api.send_message.reset_mock()
+        await store.bots_manager.handle_updates([make_chat_update(1)])
+        await store.bots_manager.handle_updates([make_chat_update(2)])
+        await store.bots_manager.outbound.join()
+        assert store.vk_api.send_message.call_count == 2
+
+    async def test_slow_dedup_does_not_reorder_replies(self, store, monkeypatch):
+        handled = []
+        first = True
+
+        async def processed(updates: list[Update]) -> set[str]:
+            nonlocal first
+            if first:
+                first = False
+                await asyncio.sleep(0.05)
+            return set()
+
+        async def handle_update(update: Update):
+            handled.append(update.object.id)
+
+        monkeypatch.setattr(store.bots_manager.dedup, "processed", processed)
+        monkeypatch.setattr(store.bots_manager, "handle_update", handle_update)
+        await asyncio.gather(
+            store.bots_manager.handle_updates([make_update(1)]),
+            store.bots_manager.handle_updates([make_update(2, user_id=1)]),
+        )
+        assert handled == [1, 2]
@@ -0,0 +1,57 @@
+import asyncio
+
+from app.store.bot.queue import OutboundQueue
+from app.store.vk_api.dataclasses import Message
+
+
+class TestOutboundQueue:
+    async def test_backpressure(self):
+        release = asyncio.Event()
+
+        async def send(message: Message):
+            await release.wait()
+
+        queue = OutboundQueue(send, workers=1, max_size=2)
+        for i in range(3):
+            await queue.put(Message(user_id=i, text="hi"))
+
+        put = asyncio.create_task(queue.put(Message(user_id=3, text="hi")))
+        await asyncio.sleep(0.01)
+        assert not put.done()
+        assert queue.stats()["depth"] == 2
+
+        release.set()
+        await put
+        await queue.stop()
+
+    async def test_stop_drains_queue(self):
+        sent = []
+
+        async def send(message: Message):
+            await asyncio.sleep(0.001)
+            sent.append(message.user_id)
+
+        queue = OutboundQueue(send, workers=3, max_size=100)
+        for i in range(20):
+            await queue.put(Message(user_id=i, text="hi"))
+        await queue.stop()
+
+        assert sorted(sent) == list(range(20))
+        assert queue.workers == []
+        stats = queue.stats()
+        assert stats["depth"] == 0
+        assert stats["sent"] == 20
+        assert stats["latency_max_ms"] >= stats["latency_avg_ms"] > 0
+
+    async def test_failed_send_does_not_stop_worker(self):
+        async def send(message: Message):
+            if message.user_id == 0:
+                raise RuntimeError
+
+        queue = OutboundQueue(send, workers=1)
+        await queue.put(Message(user_id=0, text="hi"))
+        await queue.put(Message(user_id=1, text="hi"))
+        await queue.stop()
+
+        assert queue.stats()["failed"] == 1
+        assert queue.stats()["sent"] == 1
@@ -0,0 +1,109 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.store.vk_api.dataclasses import Update, UpdateObject
+from app.store.vk_api.poller import Poller
+
+
+def make_store(handle_updates, responses=None):
+    responses = iter(responses if responses is not None else range(1, 4))
+    saved = []
+
+    async def poll():
+        try:
+            i = next(responses)
+        except StopIteration:
+            await asyncio.sleep(3600)
+        if isinstance(i, Exception):
+            raise i
+        vk_api.ts = str(i)
+        return [Update(type="message_new", object=UpdateObject(id=i, user_id=i, body=""))]
+
+    async def save_ts(ts):
+        saved.append(ts)
+
+    vk_api = SimpleNamespace(poll=poll, save_ts=save_ts, ts=None, saved=saved)
+    return SimpleNamespace(
+        vk_api=vk_api,
+        bots_manager=SimpleNamespace(handle_updates=handle_updates),
+    )
+
+
+class TestPoller:
+    async def test_polling_does_not_wait_for_handling(self):
+        release = asyncio.Event()
+        handled = []
+
+        async def handle_updates(updates):
+            await release.wait()
+            handled.extend(update.object.id for update in updates)
+
+        poller = Poller(make_store(handle_updates), handlers=1)
+        await poller.start()
+        await asyncio.sleep(0.01)
+        # all three batches were polled while the first one is still handled
+        assert poller.stats()["depth"] == 2
+        assert handled == []
+
+        release.set()
+        await poller.stop()
+        assert handled == [1, 2, 3]
+        stats = poller.stats()
+        assert stats["batches"] == 3
+        assert stats["updates"] == 3
+        assert stats["lag_max_ms"] > 0
+
+    async def test_handler_errors_are_logged(self):
+        async def handle_updates(updates):
+            raise RuntimeError
+
+        poller = Poller(make_store(handle_updates), handlers=2)
+        await poller.start()
+        await asyncio.sleep(0.01)
+        await poller.stop()
+        assert poller.stats()["batches"] == 3
+
+    async def test_backoff_after_failures(self):
+        handled = []
+
+        async def handle_updates(updates):
+            handled.extend(update.object.id for update in updates)
+
+        store = make_store(handle_updates, [RuntimeError(), RuntimeError(), 1])
+        poller = Poller(store, backoff_base=0.001, backoff_max=0.01)
+        assert poller.backoff_delay() <= 0.001
+        await poller.start()
+        await asyncio.sleep(0.05)
+        await poller.stop()
+
+        assert handled == [1]
+        assert poller.failures == 0
+
+    async def test_backoff_is_capped(self):
+        poller = Poller(make_store(None), backoff_base=1, backoff_max=5)
+        poller.failures = 20
+        assert all(0 <= poller.backoff_delay() <= 5 for _ in range(100))
+
+
+class TestCheckpoint:
+    async def test_ts_is_saved_in_batch_order(self):
+        events = {i: asyncio.Event() for i in range(1, 4)}
+
+        async def handle_updates(updates):
+            await events[updates[0].object.id].wait()
+
+        store = make_store(handle_updates)
+        poller = Poller(store, handlers=3)
+        await poller.start()
+        await asyncio.sleep(0.01)
+
+        events[2].set()
+        events[3].set()
+        await asyncio.sleep(0.01)
+        # batch 1 is still being handled, its ts must not be skipped
+        assert store.vk_api.saved == []
+
+        events[1].set()
+        await poller.stop()
+        assert store.vk_api.saved == ["3"]
+        assert poller.stats()["checkpoint_ts"] == "3"
@@ -0,0 +1,214 @@
+import asyncio
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+from app.store.vk_api.accessor import VkApiAccessor
+from app.base.rate_limit import TokenBucket
+from app.store.vk_api.batcher import ExecuteBatcher, VkApiError
+from app.store.vk_api.dataclasses import Message, UpdateObject
+
+
+@pytest.fixture
+async def vk_server(aiohttp_server):
+    peers = set()
+    calls = []
+
+    async def send(request: web.Request):
+        peers.add(request.transport.get_extra_info("peername"))
+        calls.append("messages.send")
+        return web.json_response({"response": 1})
+
+    async def execute(request: web.Request):
+        peers.add(request.transport.get_extra_info("peername"))
+        calls.append("execute")
+        code = (await request.post())["code"]
+        sends = code.split("API.messages.send(")[1:]
+        return web.json_response(
+            {"response": [False if "fail" in call else i + 1 for i, call in enumerate(sends)]}
+        )
+
+    async def get_long_poll_server(request: web.Request):
+        calls.append("groups.getLongPollServer")
+        return web.json_response(
+            {
+                "response": {
+                    "key": f"key-{len(calls)}",
+                    "server": str(server.make_url("/lp")),
+                    "ts": "100",
+                }
+            }
+        )
+
+    async def long_poll(request: web.Request):
+        calls.append(("a_check", request.query["key"], request.query["ts"]))
+        return web.json_response(server.long_poll_responses.pop(0))
+
+    app = web.Application()
+    app.router.add_post("/method/messages.send", send)
+    app.router.add_post("/method/execute", execute)
+    app.router.add_get("/method/groups.getLongPollServer", get_long_poll_server)
+    app.router.add_get("/lp", long_poll)
+    server = await aiohttp_server(app)
+    server.peers = peers
+    server.calls = calls
+    server.long_poll_responses = []
+    return server
+
+
+@pytest.fixture
+async def vk_api(cli, config, vk_server):
+    bot = replace(
+        config.bot,
+        api_url=str(vk_server.make_url("/method/")),
+        limit_per_host=3,
+        send_timeout=2,
+    )
+    app = SimpleNamespace(
+        config=replace(config, bot=bot),
+        database=cli.app.database,
+        on_startup=[],
+        on_shutdown=[],
+        on_cleanup=[],
+    )
+    accessor = VkApiAccessor(app)
+    accessor.session = accessor._create_session()
+    yield accessor
+    await accessor.session.close()
+
+
+class TestVkApiSession:
+    async def test_connector_settings(self, vk_api: VkApiAccessor):
+        connector = vk_api.session.connector
+        assert connector.limit_per_host == 3
+        assert vk_api.session.timeout.total == 2
+        assert vk_api.poll_timeout.total > vk_api.app.config.bot.poll_wait
+
+    async def test_connection_is_reused(self, vk_api: VkApiAccessor, vk_server):
+        for _ in range(5):
+            await vk_api.send_message(Message(user_id=1, text="hi"))
+        assert len(vk_server.peers) == 1
+
+
+class TestExecuteBatching:
+    async def test_single_message_is_sent_directly(self, vk_api: VkApiAccessor, vk_server):
+        assert await vk_api.send_message(Message(user_id=1, text="hi")) == 1
+        assert vk_server.calls == ["messages.send"]
+
+    async def test_messages_are_batched(self, vk_api: VkApiAccessor, vk_server):
+        results = await asyncio.gather(
+            *(vk_api.send_message(Message(user_id=i, text="hi")) for i in range(30))
+        )
+        assert vk_server.calls == ["execute", "execute"]
+        assert results == list(range(1, 26)) + list(range(1, 6))
+
+    async def test_failed_call_is_reported_to_its_caller(
+        self, vk_api: VkApiAccessor, vk_server
+    ):
+        results = await asyncio.gather(
+            vk_api.send_message(Message(user_id=1, text="ok")),
+            vk_api.send_message(Message(user_id=2, text="fail")),
+            return_exceptions=True,
+        )
+        assert results[0] == 1
+        assert isinstance(results[1], VkApiError)
+
+    async def test_calls_accumulate_while_rate_limited(self):
+        batches = []
+
+        async def execute(calls):
+            batches.append(len(calls))
+            return [1] * len(calls)
+
+        batcher = ExecuteBatcher(
+            execute, delay=0.001, limiter=TokenBucket(rate=20, capacity=1)
+        )
+        await batcher.submit("messages.send", {})
+        # the next token is 50ms away, everything submitted meanwhile is
+        # sent in one request
+        await asyncio.gather(*(batcher.submit("messages.send", {}) for _ in range(30)))
+        await batcher.close()
+        assert batches == [1, 25, 5]
+
+
+MESSAGE = {
+    "type": "message_new",
+    "object": {"id": 1, "user_id": 1, "body": "hi"},
+}
+
+
+class TestLongPoll:
+    async def test_key_is_fetched_lazily(self, vk_api: VkApiAccessor, vk_server):
+        vk_server.long_poll_responses = [{"ts": "101", "updates": [MESSAGE]}]
+
+        updates = await vk_api.poll()
+        assert [update.object.id for update in updates] == [1]
+        assert vk_api.ts == "101"
+        assert vk_server.calls == [
+            "groups.getLongPollServer",
+            ("a_check", "key-1", "100"),
+        ]
+
+    async def test_current_message_shape(self, vk_api: VkApiAccessor, vk_server):
+        vk_server.long_poll_responses = [
+            {
+                "ts": "101",
+                "updates": [
+                    {
+                        "type": "message_new",
+                        "object": {
+                            "message": {"id": 5, "from_id": 7, "peer_id": 7, "text": "hi"},
+                            "client_info": {},
+                        },
+                    },
+                    {"type": "message_typing_state", "object": {"from_id": 7}},
+                ],
+            }
+        ]
+
+        updates = await vk_api.poll()
+        assert len(updates) == 1
+        assert updates[0].object == UpdateObject(id=5, user_id=7, body="hi", peer_id=7)
+
+    async def test_outdated_ts(self, vk_api: VkApiAccessor, vk_server):
+        vk_server.long_poll_responses = [{"failed": 1, "ts": "150"}]
+        await vk_api.poll()
+        vk_server.long_poll_responses = [{"ts": "151", "updates": []}]
+        await vk_api.poll()
+
+        assert vk_server.calls == [
+            "groups.getLongPollServer",
+            ("a_check", "key-1", "100"),
+            ("a_check", "key-1", "150"),
+        ]
+
+    async def test_expired_key_keeps_ts(self, vk_api: VkApiAccessor, vk_server):
+        vk_api.ts = "120"
+        vk_server.long_poll_responses = [{"failed": 2}, {"ts": "121", "updates": []}]
+        await vk_api.poll()
+        await vk_api.poll()
+
+        assert vk_server.calls[-1] == ("a_check", "key-3", "120")
+
+    async def test_lost_info_resets_ts(self, vk_api: VkApiAccessor, vk_server):
+        vk_api.ts = "120"
+        vk_server.long_poll_responses = [{"failed": 3}, {"ts": "101", "updates": []}]
+        await vk_api.poll()
+        await vk_api.poll()
+
+        assert vk_server.calls[-1] == ("a_check", "key-3", "100")
+
+    async def test_unknown_failure_raises(self, vk_api: VkApiAccessor, vk_server):
+        vk_server.long_poll_responses = [{"failed": 4}]
+        with pytest.raises(VkApiError):
+            await vk_api.poll()
+
+
+class TestTsCheckpoint:
+    async def test_save_and_load(self, vk_api: VkApiAccessor):
+        assert await vk_api.load_ts() is None
+        await vk_api.save_ts("10")
+        await vk_api.save_ts("11")
+        assert await vk_api.load_ts() == "11"
@@ -0,0 +1,18 @@
+from app.web.config import Config
+
+
+class TestDatabaseConnect:
+    async def test_engine_uses_config(self, cli, config: Config):
+        engine = cli.app.database._engine
+        assert engine.url.host == config.database.host
+        assert engine.url.database == config.database.database
+        assert engine.url.username == config.database.user
+        assert engine.echo is config.database.echo
+
+    async def test_pool_uses_config(self, cli, config: Config):
+        pool = cli.app.database._engine.pool
+        assert pool.size() == config.database.pool_size
+        assert pool._max_overflow == config.database.max_overflow
+        assert pool._timeout == config.database.pool_timeout
+        assert pool._recycle == config.database.pool_recycle
+        assert pool._pre_ping is config.database.pool_pre_ping
@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy import insert
+
+from app.admin.models import Admin
+from app.quiz.models import AnswerModel, QuestionModel, ThemeModel
+from app.store import Store
+from tests.utils import count_statements
+
+THEMES = 20
+QUESTIONS_PER_THEME = 50
+
+
+def full_scans(plan: dict) -> list[str]:
+    scans = []
+    if plan["Node Type"] == "Seq Scan" or (
+        plan["Node Type"] in ("Index Scan", "Index Only Scan")
+        and "Index Cond" not in plan
+    ):
+        scans.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        scans += full_scans(child)
+    return scans
+
+
+async def explain(cli, queries: list) -> list[str]:
+    scans = []
+    async with cli.app.database._engine.begin() as conn:
+        # with sequential scans priced out the planner still picks a full
+        # scan (seq or unconditioned index) when no usable index exists
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        for statement, parameters in queries:
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            res = await conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            )
+            scans += full_scans(res.scalar()[0]["Plan"])
+    return scans
+
+
+@pytest.fixture
+async def catalog(cli, store: Store):
+    async with cli.app.database.transaction() as session:
+        await session.execute(
+            insert(ThemeModel),
+            [{"title": f"theme {i}"} for i in range(1, THEMES + 1)],
+        )
+        await session.execute(
+            insert(QuestionModel),
+            [
+                {"title": f"question {theme_id}-{i}", "theme_id": theme_id}
+                for theme_id in range(1, THEMES + 1)
+                for i in range(QUESTIONS_PER_THEME)
+            ],
+        )
+        await session.execute(
+            insert(AnswerModel),
+            [
+                {
+                    "title": f"answer {question_id}-{i}",
+                    "is_correct": i == 0,
+                    "question_id": question_id,
+                }
+                for question_id in range(1, THEMES * QUESTIONS_PER_THEME + 1)
+                for i in range(2)
+            ],
+        )
+    async with cli.app.database._engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql("ANALYZE themes, questions, answers, admins")
+    store.quizzes.clear_cache()
+
+
+class TestQueryPlans:
+    async def test_list_questions_by_theme(self, cli, store: Store, catalog):
+        with count_statements(cli, with_parameters=True) as queries:
+            questions = await store.quizzes.list_questions(theme_id=2)
+        assert len(questions) == QUESTIONS_PER_THEME
+        assert await explain(cli, queries) == []
+
+    async def test_get_question_by_title(self, cli, store: Store, catalog):
+        with count_statements(cli, with_parameters=True) as queries:
+            assert await store.quizzes.get_question_by_title("question 3-7")
+        assert await explain(cli, queries) == []
+
+    async def test_get_theme(self, cli, store: Store, catalog):
+        with count_statements(cli, with_parameters=True) as queries:
+            assert await store.quizzes.get_theme_by_id(5)
+            assert await store.quizzes.get_theme_by_title("theme 5")
+        assert await explain(cli, queries) == []
+
+    async def test_get_admin_by_email(self, cli, store: Store, catalog, admin: Admin):
+        with count_statements(cli, with_parameters=True) as queries:
+            assert await store.admins.get_by_email(admin.email)
+        assert await explain(cli, queries) == []
+
+    async def test_detects_seq_scan(self, cli, catalog):
+        queries = [("SELECT * FROM answers WHERE is_correct", ())]
+        assert await explain(cli, queries) == ["answers"]
@@ -32,6 +32,7 @@ def server():
     app.on_shutdown.clear()
     app.store.vk_api = AsyncMock()
     app.store.vk_api.send_message = AsyncMock()
+    app.store.vk_api.poller = None
 
     app.database = Database(app)
     app.on_startup.append(app.database.connect)
@@ -53,6 +54,11 @@ def db_session(server):
 @pytest.fixture(autouse=True, scope="function")
 async def clear_db(server):
     yield
+    server.store.quizzes.clear_cache()
+    server.store.admins.identities.clear()
+    server.store.sessions.sessions.clear()
+    server.store.bots_manager.dedup.clear()
+    server.store.games.clear()
     try:
         session = AsyncSession(server.database._engine)
         connection = session.connection()
@@ -0,0 +1,180 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from app.game.models import GameModel, GameScoreModel
+from app.quiz.models import Question, Theme
+from app.store import Store
+from app.store.game.engine import GameEngine
+from app.store.vk_api.dataclasses import Update, UpdateObject
+from tests.utils import count_statements
+
+PEER_ID = 2000000001
+
+
+def correct_answer(question: Question) -> str:
+    return next(answer.title for answer in question.answers if answer.is_correct)
+
+
+@pytest.fixture
+def questions(question_1: Question, question_2: Question) -> dict[str, Question]:
+    return {question.title: question for question in (question_1, question_2)}
+
+
+async def fetch_games(cli) -> list[GameModel]:
+    async with cli.app.database.transaction() as session:
+        return (await session.scalars(select(GameModel))).all()
+
+
+async def fetch_scores(cli) -> dict[int, int]:
+    async with cli.app.database.transaction() as session:
+        scores = (await session.scalars(select(GameScoreModel))).all()
+    return {score.user_id: score.points for score in scores}
+
+
+class TestGameEngine:
+    async def test_help_without_game(self, store: Store):
+        replies = await store.games.handle_message(PEER_ID, 1, "hello")
+        assert "/start" in replies[0]
+
+    async def test_start(self, cli, store: Store, theme_1: Theme, questions):
+        replies = await store.games.handle_message(PEER_ID, 1, f"/start {theme_1.id}")
+        assert replies[1] in questions
+        assert await store.games.handle_message(PEER_ID, 1, "/start") == ["Игра уже идёт"]
+
+        games = await fetch_games(cli)
+        assert [(game.peer_id, game.theme_id, game.is_active) for game in games] == [
+            (PEER_ID, theme_1.id, True)
+        ]
+
+    async def test_start_without_questions(self, store: Store, theme_2: Theme):
+        replies = await store.games.handle_message(PEER_ID, 1, f"/start {theme_2.id}")
+        assert replies == ["Нет вопросов по этой теме"]
+        assert PEER_ID not in store.games.games
+
+    async def test_full_game(self, cli, store: Store, theme_1: Theme, questions):
+        replies = await store.games.handle_message(PEER_ID, 1, f"/start {theme_1.id}")
+        first = questions[replies[1]]
+
+        assert await store.games.handle_message(PEER_ID, 1, "wrong") == []
+        replies = await store.games.handle_message(PEER_ID, 1, correct_answer(first).upper())
+        second = questions[replies[1]]
+        assert second is not first
+
+        replies = await store.games.handle_message(PEER_ID, 2, f"  {correct_answer(second)} ")
+        assert replies[:2] == ["Верно!", "Игра окончена"]
+        assert "id1: 1" in replies[2] and "id2: 1" in replies[2]
+        assert PEER_ID not in store.games.games
+
+        await store.games.flush()
+        games = await fetch_games(cli)
+        assert games[0].is_active is False
+        assert games[0].finished_at is not None
+        assert sorted(games[0].asked_question_ids) == sorted(q.id for q in questions.values())
+        assert await fetch_scores(cli) == {1: 1, 2: 1}
+
+    async def test_stop(self, store: Store, theme_1: Theme, questions):
+        await store.games.handle_message(PEER_ID, 1, f"/start {theme_1.id}")
+        replies = await store.games.handle_message(PEER_ID, 1, "/stop")
+        assert replies[0] == "Игра окончена"
+        assert await store.games.handle_message(PEER_ID, 1, "/stop") == ["Игра не идёт"]
+
+
+class TestWriteBehind:
+    async def test_answers_do_not_write(
+        self, cli, store: Store, theme_1: Theme, questions
+    ):
+        replies = await store.games.handle_message(PEER_ID, 1, f"/start {theme_1.id}")
+        with count_statements(cli) as statements:
+            await store.games.handle_message(PEER_ID, 2, "wrong")
+            await store.games.handle_message(PEER_ID, 1, correct_answer(questions[replies[1]]))
+        # at most the next question is read, by id
+        assert all(statement.lstrip().startswith("SELECT") for statement in statements)
+        assert await fetch_scores(cli) == {}
+
+    async def test_flush_batches_changes(self, cli, store: Store, theme_1: Theme, questions):
+        for peer_id in range(1, 4):
+            await store.games.handle_message(peer_id, 1, f"/start {theme_1.id}")
+            question = questions[store.games.games[peer_id].question.title]
+            await store.games.handle_message(peer_id, peer_id, correct_answer(question))
+
+        with count_statements(cli) as statements:
+            await store.games.flush()
+        assert len(statements) == 2
+        assert await fetch_scores(cli) == {1: 1, 2: 1, 3: 1}
+
+        with count_statements(cli) as statements:
+            await store.games.flush()
+        assert statements == []
+
+    async def test_active_games_survive_restart(
+        self, cli, store: Store, theme_1: Theme, questions
+    ):
+        replies = await store.games.handle_message(PEER_ID, 1, f"/start {theme_1.id}")
+        await store.games.handle_message(PEER_ID, 7, correct_answer(questions[replies[1]]))
+        current = store.games.games[PEER_ID].question
+        await store.games.flush()
+
+        restarted = GameEngine(
+            SimpleNamespace(
+                config=cli.app.config,
+                database=cli.app.database,
+                store=store,
+                on_startup=[],
+                on_shutdown=[],
+                on_cleanup=[],
+            )
+        )
+        await restarted.load_active_games()
+        state = restarted.games[PEER_ID]
+        assert state.question.id == current.id
+        assert state.scores == {7: 1}
+
+        assert state.remaining == []
+
+        replies = await restarted.handle_message(PEER_ID, 7, correct_answer(current))
+        assert replies[1] == "Игра окончена"
+
+    async def test_next_question_is_fetched_by_id(
+        self, cli, store: Store, theme_1: Theme, questions
+    ):
+        await store.games.handle_message(PEER_ID, 1, f"/start {theme_1.id}")
+        state = store.games.games[PEER_ID]
+        assert len(state.remaining) == len(questions) - 1
+
+        store.quizzes.clear_cache()
+        with count_statements(cli) as statements:
+            question = await store.games.next_question(state)
+        assert question.id not in state.asked[:-1]
+        assert state.remaining == []
+        assert "questions.id = " in statements[0]
+
+    async def test_games_load_before_polling(self, cli):
+        app = SimpleNamespace(
+            config=cli.app.config, on_startup=[], on_shutdown=[], on_cleanup=[]
+        )
+        store = Store(app)
+        polling = app.on_startup.index(store.vk_api.start_polling)
+        assert app.on_startup.index(store.games.connect) < polling
+        assert app.on_startup.index(store.bots_manager.connect) < polling
+
+
+class TestBotGame:
+    async def test_replies_go_to_chat(self, store: Store, theme_1: Theme, questions):
+        store.vk_api.send_message.reset_mock()
+        await store.bots_manager.handle_updates(
+            [
+                Update(
+                    type="message_new",
+                    object=UpdateObject(
+                        id=1, user_id=5, body=f"/start {theme_1.id}", peer_id=PEER_ID
+                    ),
+                )
+            ]
+        )
+        await store.bots_manager.outbound.join()
+
+        message = store.vk_api.send_message.mock_calls[0].args[0]
+        assert message.peer_id == PEER_ID
+        assert message.text.split("\n\n")[1] in questions
@@ -1,5 +1,7 @@
+from sqlalchemy import text
+
 from app.store import Store
-from tests.utils import ok_response
+from tests.utils import count_statements, ok_response
 
 
 class TestAdminLoginView:
@@ -63,3 +65,37 @@ class TestAdminLoginView:
         assert resp.status == 405
         data = await resp.json()
         assert data["status"] == "not_implemented"
+
+
+class TestAdminIdentityCache:
+    async def test_protected_request_skips_admin_lookup(self, authed_cli):
+        await authed_cli.get("/quiz.list_themes")
+        with count_statements(authed_cli) as statements:
+            resp = await authed_cli.get("/quiz.list_themes")
+        assert resp.status == 200
+        assert not any("admins" in statement for statement in statements)
+
+    async def test_current(self, authed_cli, config):
+        resp = await authed_cli.get("/admin.current")
+        assert resp.status == 200
+        data = await resp.json()
+        assert data == ok_response({"id": 1, "email": config.admin.email})
+
+    async def test_unknown_admin_forbidden(self, authed_cli, store: Store, config):
+        async with authed_cli.app.database.session() as session:
+            await session.execute(text("DELETE FROM admins"))
+            await session.commit()
+        store.admins.invalidate_identity(config.admin.email)
+
+        resp = await authed_cli.get("/quiz.list_themes")
+        assert resp.status == 403
+
+    async def test_identity_lookup_error_is_json(self, authed_cli, store: Store, monkeypatch):
+        async def get_identity(email: str):
+            raise RuntimeError("database is down")
+
+        monkeypatch.setattr(store.admins, "get_identity", get_identity)
+        resp = await authed_cli.get("/quiz.list_themes")
+        assert resp.status == 500
+        data = await resp.json()
+        assert data["status"] == "internal server error"
@@ -0,0 +1,80 @@
+from hashlib import sha256
+
+from sqlalchemy import select
+
+from app.admin.models import AdminModel
+from app.store import Store
+from app.store.admin.hasher import PasswordHasher, check_password
+from app.web.config import PasswordConfig
+
+
+class TestPasswordHasher:
+    async def test_scrypt(self):
+        hasher = PasswordHasher(PasswordConfig(algorithm="scrypt", scrypt_n=1024))
+        hashed = await hasher.hash("secret")
+        assert hashed.startswith("scrypt$1024$")
+        assert await hasher.verify("secret", hashed)
+        assert not await hasher.verify("wrong", hashed)
+        assert not hasher.needs_rehash(hashed)
+        hasher.close()
+
+    async def test_pbkdf2(self):
+        hasher = PasswordHasher(
+            PasswordConfig(algorithm="pbkdf2_sha256", pbkdf2_iterations=1000)
+        )
+        hashed = await hasher.hash("secret")
+        assert hashed.startswith("pbkdf2_sha256$1000$")
+        assert await hasher.verify("secret", hashed)
+        assert not await hasher.verify("wrong", hashed)
+        hasher.close()
+
+    def test_legacy_sha256(self):
+        hashed = sha256(b"secret").hexdigest()
+        assert check_password("secret", hashed)
+        assert not check_password("wrong", hashed)
+        assert PasswordHasher(PasswordConfig()).needs_rehash(hashed)
+
+    def test_malformed_hash(self):
+        for hashed in ("scrypt$1024$8", "scrypt$1024$8$1$%%%$%%%", "pbkdf2_sha256$x$a$b"):
+            assert not check_password("secret", hashed)
+
+    def test_needs_rehash_on_cost_change(self):
+        hashed = PasswordHasher(PasswordConfig(scrypt_n=1024)).hash_sync("secret")
+        assert PasswordHasher(PasswordConfig(scrypt_n=2048)).needs_rehash(hashed)
+        assert check_password("secret", hashed)
+
+
+class TestPasswordStorage:
+    async def test_create_admin_uses_kdf(self, cli, store: Store):
+        admin = await store.admins.create_admin("new@admin.com", "secret")
+        assert admin.password.startswith("scrypt$")
+        assert await admin.is_password_valid("secret", store.admins.hasher.verify)
+
+    async def test_login_rehashes_legacy_hash(self, cli, store: Store, config):
+        resp = await cli.post(
+            "/admin.login",
+            json={
+                "email": config.admin.email,
+                "password": config.admin.password,
+            },
+        )
+        assert resp.status == 200
+
+        async with cli.app.database.session() as session:
+            res = await session.execute(
+                select(AdminModel.password).where(
+                    AdminModel.email == config.admin.email
+                )
+            )
+            password = res.scalar()
+        assert password.startswith("scrypt$")
+        assert check_password(config.admin.password, password)
+
+        resp = await cli.post(
+            "/admin.login",
+            json={
+                "email": config.admin.email,
+                "password": config.admin.password,
+            },
+        )
+        assert resp.status == 200
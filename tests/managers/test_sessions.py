@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select, update
+
+from app.admin.models import SessionModel
+from app.store import Store
+from app.store.session.accessor import PostgresSessionAccessor, SessionAccessor
+from app.web.sessions import SESSION_KEY_BYTES
+from tests.utils import check_empty_table_exists, count_statements
+
+
+async def login(cli, config):
+    resp = await cli.post(
+        "/admin.login",
+        json={"email": config.admin.email, "password": config.admin.password},
+    )
+    assert resp.status == 200
+    return resp
+
+
+class TestServerSideSessions:
+    async def test_cookie_holds_only_session_id(self, cli, store: Store, config):
+        resp = await login(cli, config)
+        key = resp.cookies["AIOHTTP_SESSION"].value
+
+        assert len(key) < SESSION_KEY_BYTES * 2
+        assert config.admin.email not in key
+        assert await store.sessions.load(key) is not None
+
+    async def test_session_survives_requests(self, cli, config):
+        await login(cli, config)
+        resp = await cli.get("/admin.current")
+        assert resp.status == 200
+
+    async def test_unknown_session_id(self, cli):
+        cli.session.cookie_jar.update_cookies({"AIOHTTP_SESSION": "missing"})
+        resp = await cli.get("/admin.current")
+        assert resp.status == 401
+
+    async def test_expired_sessions_are_purged(self, store: Store):
+        await store.sessions.save("expired", "{}", 1)
+        assert await store.sessions.delete_expired(10) == 0
+
+        store.sessions.sessions._data["expired"] = (0.0, "{}")
+        assert await store.sessions.delete_expired(10) == 1
+        assert await store.sessions.load("expired") is None
+
+
+class TestSessionAccessor:
+    def test_incomplete_backend_fails_on_construction(self, cli):
+        class LoadOnly(SessionAccessor):
+            async def load(self, key: str) -> str | None:
+                return None
+
+        app = SimpleNamespace(config=cli.app.config, on_startup=[], on_cleanup=[])
+        with pytest.raises(TypeError):
+            LoadOnly(app)
+
+
+@pytest.fixture
+def pg_sessions(cli) -> PostgresSessionAccessor:
+    app = SimpleNamespace(
+        config=cli.app.config,
+        database=cli.app.database,
+        on_startup=[],
+        on_cleanup=[],
+    )
+    return PostgresSessionAccessor(app)
+
+
+class TestPostgresSessionAccessor:
+    async def test_table_exists(self, cli):
+        await check_empty_table_exists(cli, "sessions")
+
+    async def test_save_and_load(self, pg_sessions: PostgresSessionAccessor):
+        await pg_sessions.save("key", '{"a": 1}', 60)
+        assert await pg_sessions.load("key") == '{"a": 1}'
+
+        await pg_sessions.save("key", '{"a": 2}', 60)
+        assert await pg_sessions.load("key") == '{"a": 2}'
+
+        await pg_sessions.delete("key")
+        assert await pg_sessions.load("key") is None
+
+    async def test_delete_expired_in_batches(
+        self, cli, pg_sessions: PostgresSessionAccessor
+    ):
+        for i in range(5):
+            await pg_sessions.save(f"old-{i}", "{}", 60)
+        await pg_sessions.save("fresh", "{}", 60)
+        async with cli.app.database.transaction() as session:
+            await session.execute(
+                update(SessionModel)
+                .where(SessionModel.key.like("old-%"))
+                .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+                .execution_options(synchronize_session=False)
+            )
+        pg_sessions.cache.clear()
+
+        assert await pg_sessions.load("old-0") is None
+        assert await pg_sessions.delete_expired(3) == 3
+        assert await pg_sessions.delete_expired(3) == 2
+        assert await pg_sessions.delete_expired(3) == 0
+
+        async with cli.app.database.transaction() as session:
+            keys = (await session.scalars(select(SessionModel.key))).all()
+        assert keys == ["fresh"]
+
+    async def test_load_is_cached(self, cli, pg_sessions: PostgresSessionAccessor):
+        await pg_sessions.save("key", '{"a": 1}', 60)
+        with count_statements(cli) as statements:
+            assert await pg_sessions.load("key") == '{"a": 1}'
+        assert statements == []
+
+        pg_sessions.cache.clear()
+        with count_statements(cli) as statements:
+            assert await pg_sessions.load("key") == '{"a": 1}'
+            assert await pg_sessions.load("key") == '{"a": 1}'
+        assert len(statements) == 1
+
+        await pg_sessions.delete("key")
+        assert await pg_sessions.load("key") is None
+
+    async def test_cached_session_expires(self, pg_sessions: PostgresSessionAccessor):
+        await pg_sessions.save("key", "{}", 60)
+        data, _ = pg_sessions.cache.get("key")
+        pg_sessions.cache.set("key", (data, datetime.now(timezone.utc) - timedelta(seconds=1)))
+        assert await pg_sessions.load("key") is None
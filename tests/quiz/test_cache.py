@@ -0,0 +1,174 @@
+import asyncio
+
+import pytest
+
+from app.quiz.models import Answer, Question, Theme
+from app.store import Database, Store
+from app.store.quiz.accessor import CACHE_CHANNEL
+from tests.utils import count_statements
+
+
+class TestQuizCache:
+    async def test_theme_by_id_is_cached(self, cli, store: Store, theme_1: Theme):
+        assert await store.quizzes.get_theme_by_id(theme_1.id) == theme_1
+        with count_statements(cli) as statements:
+            assert await store.quizzes.get_theme_by_id(theme_1.id) == theme_1
+        assert statements == []
+        assert store.quizzes.cache_stats()["themes"]["hits"] >= 1
+
+    async def test_list_themes_invalidated_on_create(
+        self, cli, store: Store, theme_1: Theme
+    ):
+        assert await store.quizzes.list_themes() == [theme_1]
+        theme = await store.quizzes.create_theme_if_not_exists("new")
+        assert await store.quizzes.list_themes() == [theme_1, theme]
+
+    async def test_list_questions_invalidated_on_create(
+        self, cli, store: Store, question_1: Question, answers: list[Answer]
+    ):
+        assert await store.quizzes.list_questions(question_1.theme_id) == [question_1]
+        with count_statements(cli) as statements:
+            assert await store.quizzes.list_questions(question_1.theme_id) == [
+                question_1
+            ]
+        assert statements == []
+
+        question = await store.quizzes.create_question(
+            "new", question_1.theme_id, answers
+        )
+        assert await store.quizzes.list_questions(question_1.theme_id) == [
+            question_1,
+            question,
+        ]
+
+    async def test_rolled_back_write_keeps_cache(
+        self, cli, store: Store, theme_1: Theme
+    ):
+        assert await store.quizzes.list_themes() == [theme_1]
+        with pytest.raises(RuntimeError):
+            async with cli.app.database.transaction():
+                await store.quizzes.create_theme("new")
+                assert len(store.quizzes.theme_lists_cache) == 1
+                raise RuntimeError
+        assert len(store.quizzes.theme_lists_cache) == 1
+        assert await store.quizzes.list_themes() == [theme_1]
+
+    async def test_read_in_rolled_back_transaction_is_not_cached(
+        self, cli, store: Store, theme_1: Theme
+    ):
+        with pytest.raises(RuntimeError):
+            async with cli.app.database.transaction():
+                theme = await store.quizzes.create_theme("new")
+                assert await store.quizzes.get_theme_by_id(theme.id) == theme
+                raise RuntimeError
+        assert len(store.quizzes.themes_cache) == 0
+        assert await store.quizzes.get_theme_by_id(theme.id) is None
+
+    async def test_read_racing_invalidation_is_not_cached(
+        self, cli, store: Store, theme_1: Theme
+    ):
+        async with cli.app.database.transaction():
+            assert await store.quizzes.list_themes() == [theme_1]
+            # a NOTIFY from another worker arrives before the read commits
+            store.quizzes.apply_changes({"titles": ["other"]})
+        assert len(store.quizzes.theme_lists_cache) == 0
+
+    async def test_cached_questions_are_copies(
+        self, cli, store: Store, question_1: Question
+    ):
+        [question] = await store.quizzes.list_questions(question_1.theme_id)
+        question.answers.clear()
+        assert await store.quizzes.list_questions(question_1.theme_id) == [question_1]
+
+        by_id = await store.quizzes.get_question_by_id(question_1.id)
+        by_id.answers.clear()
+        assert await store.quizzes.get_question_by_id(question_1.id) == question_1
+
+
+@pytest.fixture
+async def other_worker(cli):
+    database = Database(cli.app)
+    await database.connect()
+    yield database
+    await database.disconnect()
+
+
+class TestCacheNotifications:
+    async def test_write_notifies_other_workers(
+        self, cli, store: Store, other_worker: Database, theme_1: Theme, answers
+    ):
+        received = asyncio.Queue()
+        await other_worker.subscribe(CACHE_CHANNEL, received.put_nowait)
+
+        question = await store.quizzes.create_question("new", theme_1.id, answers)
+        changes = await asyncio.wait_for(received.get(), timeout=5)
+        assert changes["question_ids"] == [question.id]
+        assert changes["question_theme_ids"] == [theme_1.id]
+
+    async def test_rolled_back_write_does_not_notify(
+        self, cli, store: Store, other_worker: Database
+    ):
+        received = asyncio.Queue()
+        await other_worker.subscribe(CACHE_CHANNEL, received.put_nowait)
+
+        with pytest.raises(RuntimeError):
+            async with cli.app.database.transaction():
+                await store.quizzes.create_theme("new")
+                raise RuntimeError
+        await store.quizzes.create_theme("committed")
+
+        changes = await asyncio.wait_for(received.get(), timeout=5)
+        assert changes["titles"] == ["committed"]
+        assert received.empty()
+
+    async def test_batch_sends_one_notification(
+        self, cli, store: Store, other_worker: Database, theme_1: Theme, answers
+    ):
+        received = asyncio.Queue()
+        await other_worker.subscribe(CACHE_CHANNEL, received.put_nowait)
+
+        await store.quizzes.create_questions(
+            [
+                Question(id=0, title=f"new {i}", theme_id=theme_1.id, answers=answers)
+                for i in range(3)
+            ]
+        )
+        changes = await asyncio.wait_for(received.get(), timeout=5)
+        assert changes["question_theme_ids"] == [theme_1.id]
+        await asyncio.sleep(0.1)
+        assert received.empty()
+
+    async def test_own_notifications_are_skipped(self, cli, store: Store):
+        received = []
+        await cli.app.database.subscribe(CACHE_CHANNEL, received.append)
+        await store.quizzes.create_theme("new")
+        await asyncio.sleep(0.1)
+        assert received == []
+
+    async def test_apply_changes(self, cli, store: Store, question_1: Question):
+        await store.quizzes.get_theme_by_id(question_1.theme_id)
+        await store.quizzes.list_questions(question_1.theme_id)
+
+        store.quizzes.apply_changes({"question_theme_ids": [question_1.theme_id]})
+        assert len(store.quizzes.question_lists_cache) == 0
+        assert len(store.quizzes.themes_cache) == 1
+
+        store.quizzes.apply_changes({"theme_ids": [question_1.theme_id]})
+        assert len(store.quizzes.themes_cache) == 0
+
+
+class TestAdminMetricsView:
+    async def test_unauthorized(self, cli):
+        resp = await cli.get("/admin.metrics")
+        assert resp.status == 401
+
+    async def test_success(self, authed_cli, theme_1: Theme):
+        await authed_cli.get("/quiz.list_themes")
+        await authed_cli.get("/quiz.list_themes")
+
+        resp = await authed_cli.get("/admin.metrics")
+        assert resp.status == 200
+        data = (await resp.json())["data"]
+        assert data["quiz_cache"]["theme_lists"]["hits"] >= 1
+        assert data["quiz_cache"]["theme_lists"]["misses"] >= 1
+        assert data["outbound_queue"]["depth"] == 0
@@ -0,0 +1,74 @@
+import json
+
+from app.quiz.models import Question, Theme
+from app.store import Store
+from tests.quiz import question2dict, theme2dict
+
+
+class TestExportCatalog:
+    async def test_batches(
+        self,
+        cli,
+        store: Store,
+        theme_1: Theme,
+        theme_2: Theme,
+        question_1: Question,
+        question_2: Question,
+    ):
+        batches = [
+            batch async for batch in store.quizzes.export_catalog(batch_size=1)
+        ]
+        items = [item for batch in batches for item in batch]
+        assert items == [theme_1, theme_2, question_1, question_2]
+        assert all(len(batch) <= 1 for batch in batches)
+
+    async def test_empty(self, cli, store: Store):
+        assert [batch async for batch in store.quizzes.export_catalog()] == []
+
+
+class TestQuizExportView:
+    async def test_unauthorized(self, cli):
+        resp = await cli.get("/quiz.export")
+        assert resp.status == 401
+        data = await resp.json()
+        assert data["status"] == "unauthorized"
+
+    async def test_success(
+        self, authed_cli, theme_1: Theme, question_1: Question, question_2: Question
+    ):
+        resp = await authed_cli.get("/quiz.export")
+        assert resp.status == 200
+        assert resp.content_type == "application/x-ndjson"
+
+        lines = [json.loads(line) for line in (await resp.text()).splitlines()]
+        assert lines == [
+            {"type": "theme", "data": theme2dict(theme_1)},
+            {"type": "question", "data": question2dict(question_1)},
+            {"type": "question", "data": question2dict(question_2)},
+        ]
+
+    async def test_error_before_first_page(self, authed_cli, store: Store, monkeypatch):
+        async def export_catalog():
+            raise RuntimeError("database is down")
+            yield
+
+        monkeypatch.setattr(store.quizzes, "export_catalog", export_catalog)
+        resp = await authed_cli.get("/quiz.export")
+        assert resp.status == 500
+        data = await resp.json()
+        assert data["status"] == "internal server error"
+
+    async def test_error_mid_stream(
+        self, authed_cli, store: Store, monkeypatch, theme_1: Theme
+    ):
+        async def export_catalog():
+            yield [theme_1]
+            raise RuntimeError("connection lost")
+
+        monkeypatch.setattr(store.quizzes, "export_catalog", export_catalog)
+        resp = await authed_cli.get("/quiz.export")
+        lines = [json.loads(line) for line in (await resp.text()).splitlines()]
+        assert lines == [
+            {"type": "theme", "data": theme2dict(theme_1)},
+            {"type": "error", "message": "connection lost"},
+        ]
@@ -0,0 +1,191 @@
+import json
+
+from sqlalchemy.future import select
+
+from app.quiz.models import Answer, AnswerModel, Question, QuestionModel, RejectedQuestion, Theme
+from app.store import Store
+from app.store.quiz.accessor import DUPLICATE_TITLE, UNIQUE_VIOLATION
+
+
+def question_row(title: str, theme_id: int, answers: tuple[str, str]) -> dict:
+    return {
+        "title": title,
+        "theme_id": theme_id,
+        "answers": [
+            {"title": answers[0], "is_correct": True},
+            {"title": answers[1], "is_correct": False},
+        ],
+    }
+
+
+class TestCreateQuestions:
+    async def test_success(self, cli, store: Store, theme_1: Theme):
+        questions = [
+            Question(
+                id=None,
+                title=f"question {i}",
+                theme_id=theme_1.id,
+                answers=[
+                    Answer(title=f"answer {i}-1", is_correct=True),
+                    Answer(title=f"answer {i}-2", is_correct=False),
+                ],
+            )
+            for i in range(3)
+        ]
+        created = await store.quizzes.create_questions(questions)
+        assert [question.title for question in created] == [
+            "question 0",
+            "question 1",
+            "question 2",
+        ]
+        assert await store.quizzes.list_questions() == created
+
+    async def test_duplicates(
+        self, cli, store: Store, theme_1: Theme, question_1: Question
+    ):
+        questions = [
+            Question(
+                id=None,
+                title=question_1.title,
+                theme_id=theme_1.id,
+                answers=[Answer(title="a", is_correct=True)],
+            ),
+            Question(
+                id=None,
+                title="new",
+                theme_id=theme_1.id,
+                answers=[Answer(title="b", is_correct=True)],
+            ),
+            Question(
+                id=None,
+                title="new",
+                theme_id=theme_1.id,
+                answers=[Answer(title="c", is_correct=True)],
+            ),
+            Question(
+                id=None,
+                title="answer clash",
+                theme_id=theme_1.id,
+                answers=[Answer(title=question_1.answers[0].title, is_correct=True)],
+            ),
+        ]
+        created = await store.quizzes.create_questions(questions)
+        assert created[0] == DUPLICATE_TITLE
+        assert created[1].title == "new"
+        assert created[2] == DUPLICATE_TITLE
+        assert isinstance(created[3], RejectedQuestion)
+        assert (created[3].code, created[3].field) == (UNIQUE_VIOLATION, "answers")
+        assert "answers_title_key" in created[3].message
+
+        async with cli.app.database.session() as session:
+            res = await session.execute(select(QuestionModel.title))
+            titles = res.scalars().all()
+            res = await session.execute(select(AnswerModel.title))
+            answer_titles = res.scalars().all()
+        assert sorted(titles) == sorted([question_1.title, "new"])
+        assert "c" not in answer_titles
+
+
+class TestQuestionImportView:
+    async def test_unauthorized(self, cli):
+        resp = await cli.post("/quiz.import_questions", json=[])
+        assert resp.status == 401
+
+    async def test_json_array(self, authed_cli, theme_1: Theme, question_1: Question):
+        resp = await authed_cli.post(
+            "/quiz.import_questions",
+            json=[
+                question_row("first", theme_1.id, ("1", "2")),
+                question_row(question_1.title, theme_1.id, ("3", "4")),
+                {"title": "no answers", "theme_id": theme_1.id},
+                question_row("unknown theme", 100, ("5", "6")),
+                {
+                    "title": "two correct",
+                    "theme_id": theme_1.id,
+                    "answers": [
+                        {"title": "7", "is_correct": True},
+                        {"title": "8", "is_correct": True},
+                    ],
+                },
+            ],
+        )
+        assert resp.status == 200
+        data = (await resp.json())["data"]
+        assert data["created"] == 1
+        assert data["duplicate"] == 1
+        assert data["invalid"] == 3
+        assert [row["status"] for row in data["rows"]] == [
+            "created",
+            "duplicate",
+            "invalid",
+            "invalid",
+            "invalid",
+        ]
+        assert "answers" in data["rows"][2]["errors"]
+        assert "theme_id" in data["rows"][3]["errors"]
+
+    async def test_ndjson(self, authed_cli, theme_1: Theme):
+        body = "\n".join(
+            [
+                json.dumps(question_row("first", theme_1.id, ("1", "2"))),
+                "not json",
+                json.dumps(question_row("second", theme_1.id, ("3", "4"))),
+            ]
+        )
+        resp = await authed_cli.post(
+            "/quiz.import_questions",
+            data=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert resp.status == 200
+        data = (await resp.json())["data"]
+        assert [row["status"] for row in data["rows"]] == [
+            "created",
+            "invalid",
+            "created",
+        ]
+
+        resp = await authed_cli.get("/quiz.list_questions")
+        questions = (await resp.json())["data"]["questions"]
+        assert [question["title"] for question in questions] == ["first", "second"]
+
+    async def test_ndjson_larger_than_client_max_size(
+        self, authed_cli, theme_1: Theme, monkeypatch
+    ):
+        monkeypatch.setattr("app.quiz.views.IMPORT_BATCH_SIZE", 4)
+        padding = "x" * 100_000
+        body = "\n".join(
+            json.dumps(question_row(f"{i} {padding}", theme_1.id, (f"{i}-1", f"{i}-2")))
+            for i in range(15)
+        )
+        assert len(body) > authed_cli.app._client_max_size
+
+        resp = await authed_cli.post(
+            "/quiz.import_questions",
+            data=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert resp.status == 200
+        data = (await resp.json())["data"]
+        assert data["created"] == 15
+        assert [row["index"] for row in data["rows"]] == list(range(15))
+
+    async def test_rejected_answers_are_invalid(
+        self, authed_cli, theme_1: Theme, question_1: Question
+    ):
+        resp = await authed_cli.post(
+            "/quiz.import_questions",
+            json=[
+                question_row("new", theme_1.id, (question_1.answers[0].title, "x")),
+                question_row(question_1.title, theme_1.id, ("y", "z")),
+            ],
+        )
+        data = (await resp.json())["data"]
+        assert [row["status"] for row in data["rows"]] == ["invalid", "duplicate"]
+        assert "answers" in data["rows"][0]["errors"]
+
+    async def test_not_a_list(self, authed_cli):
+        resp = await authed_cli.post("/quiz.import_questions", json={"title": "kek"})
+        assert resp.status == 400
+        data = await resp.json()
+        assert data["status"] == "bad_request"
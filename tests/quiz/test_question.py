@@ -6,7 +6,7 @@ from sqlalchemy.future import select
 from app.quiz.models import Answer, AnswerModel, Question, QuestionModel, Theme
 from app.store import Store
 from tests.quiz import question2dict
-from tests.utils import check_empty_table_exists
+from tests.utils import check_empty_table_exists, count_checkouts, count_statements
 from tests.utils import ok_response
 
 
@@ -66,6 +66,22 @@ class TestQuestionsStore:
             )
         assert exc_info.value.orig.pgcode == "23505"
 
+    async def test_create_question_is_atomic(
+        self, cli, store: Store, question_1: Question, theme_1: Theme
+    ):
+        answers = [
+            Answer(title="new", is_correct=True),
+            Answer(title=question_1.answers[0].title, is_correct=False),
+        ]
+        with pytest.raises(IntegrityError) as exc_info:
+            await store.quizzes.create_question("title", theme_1.id, answers)
+        assert exc_info.value.orig.pgcode == "23505"
+
+        async with cli.app.database.session() as session:
+            res = await session.execute(select(QuestionModel))
+            questions = res.scalars().all()
+        assert [question.title for question in questions] == [question_1.title]
+
     async def test_get_question_by_title(self, cli, store: Store, question_1: Question):
         assert question_1 == await store.quizzes.get_question_by_title(question_1.title)
 
@@ -75,6 +91,37 @@ class TestQuestionsStore:
         questions = await store.quizzes.list_questions()
         assert questions == [question_1, question_2]
 
+    async def test_list_questions_statement_count(
+        self, cli, store: Store, db_session, theme_1: Theme
+    ):
+        async def add_questions(count: int):
+            async with db_session.begin() as session:
+                session.add_all(
+                    QuestionModel(
+                        title=f"question {count}-{i}",
+                        theme_id=theme_1.id,
+                        answers=[
+                            AnswerModel(title=f"answer {count}-{i}-1", is_correct=True),
+                            AnswerModel(title=f"answer {count}-{i}-2", is_correct=False),
+                        ],
+                    )
+                    for i in range(count)
+                )
+
+        await add_questions(1)
+        with count_statements(cli) as few:
+            questions = await store.quizzes.list_questions()
+        assert len(questions) == 1
+
+        await add_questions(10)
+        store.quizzes.clear_cache()
+        with count_statements(cli) as many:
+            questions = await store.quizzes.list_questions()
+        assert len(questions) == 11
+        assert all(len(question.answers) == 2 for question in questions)
+
+        assert len(few) == len(many)
+
     async def test_check_cascade_delete(self, cli, question_1: Question):
         async with cli.app.database.session() as session:
             await session.execute(
@@ -147,6 +194,55 @@ class TestQuestionAddView:
         data = await resp.json()
         assert data["status"] == "unauthorized"
 
+    async def test_single_connection_checkout(self, authed_cli, theme_1: Theme):
+        with count_checkouts(authed_cli) as checkouts:
+            resp = await authed_cli.post(
+                "/quiz.add_question",
+                json={
+                    "title": "How many legs does an octopus have?",
+                    "theme_id": theme_1.id,
+                    "answers": [
+                        {
+                            "title": "2",
+                            "is_correct": False,
+                        },
+                        {
+                            "title": "8",
+                            "is_correct": True,
+                        },
+                    ],
+                },
+            )
+        assert resp.status == 200
+        assert len(checkouts) == 1
+
+    async def test_conflict(self, authed_cli, question_1: Question):
+        resp = await authed_cli.post(
+            "/quiz.add_question",
+            json={
+                "title": question_1.title,
+                "theme_id": question_1.theme_id,
+                "answers": [
+                    {
+                        "title": "2",
+                        "is_correct": False,
+                    },
+                    {
+                        "title": "8",
+                        "is_correct": True,
+                    },
+                ],
+            },
+        )
+        assert resp.status == 409
+        data = await resp.json()
+        assert data["status"] == "conflict"
+
+        async with authed_cli.app.database.session() as session:
+            res = await session.execute(select(AnswerModel))
+            db_answers = res.scalars().all()
+        assert len(db_answers) == len(question_1.answers)
+
     async def test_theme_not_found(self, authed_cli):
         resp = await authed_cli.post(
             "/quiz.add_question",
@@ -254,3 +350,27 @@ class TestQuestionListView:
         assert data == ok_response(
             data={"questions": [question2dict(question_1), question2dict(question_2)]}
         )
+
+    async def test_paginated(
+        self, authed_cli, question_1: Question, question_2: Question
+    ):
+        resp = await authed_cli.get("/quiz.list_questions", params={"limit": 1})
+        assert resp.status == 200
+        data = await resp.json()
+        assert data["data"]["questions"] == [question2dict(question_1)]
+        next_cursor = data["data"]["next_cursor"]
+        assert next_cursor
+
+        resp = await authed_cli.get(
+            "/quiz.list_questions",
+            params={
+                "theme_id": question_2.theme_id,
+                "limit": 1,
+                "cursor": next_cursor,
+            },
+        )
+        assert resp.status == 200
+        data = await resp.json()
+        assert data == ok_response(
+            data={"questions": [question2dict(question_2)], "next_cursor": None}
+        )
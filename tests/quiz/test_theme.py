@@ -6,7 +6,7 @@ from sqlalchemy.future import select
 from app.quiz.models import Question, QuestionModel, Theme, ThemeModel
 from app.store import Store
 from tests.quiz import theme2dict
-from tests.utils import check_empty_table_exists
+from tests.utils import check_empty_table_exists, count_statements
 from tests.utils import ok_response
 
 
@@ -35,6 +35,21 @@ class TestThemeStore:
             await store.quizzes.create_theme(theme_1.title)
         assert exc_info.value.orig.pgcode == "23505"
 
+    async def test_create_theme_if_not_exists(self, cli, store: Store):
+        with count_statements(cli) as statements:
+            theme = await store.quizzes.create_theme_if_not_exists("title")
+        assert theme == Theme(id=1, title="title")
+        assert len(statements) == 1
+        assert "pg_notify" in statements[0]
+
+    async def test_create_theme_if_not_exists_conflict(
+        self, cli, store: Store, theme_1: Theme
+    ):
+        with count_statements(cli) as statements:
+            theme = await store.quizzes.create_theme_if_not_exists(theme_1.title)
+        assert theme is None
+        assert len(statements) == 1
+
     async def test_get_theme_by_id(self, store: Store, theme_1: Theme):
         theme = await store.quizzes.get_theme_by_id(theme_1.id)
         assert theme == theme_1
@@ -145,6 +160,31 @@ class TestThemeList:
             data={"themes": [theme2dict(theme_1), theme2dict(theme_2)]}
         )
 
+    async def test_paginated(self, authed_cli, theme_1, theme_2):
+        resp = await authed_cli.get("/quiz.list_themes", params={"limit": 1})
+        assert resp.status == 200
+        data = await resp.json()
+        assert data["data"]["themes"] == [theme2dict(theme_1)]
+        next_cursor = data["data"]["next_cursor"]
+        assert next_cursor
+
+        resp = await authed_cli.get(
+            "/quiz.list_themes", params={"limit": 1, "cursor": next_cursor}
+        )
+        assert resp.status == 200
+        data = await resp.json()
+        assert data == ok_response(
+            data={"themes": [theme2dict(theme_2)], "next_cursor": None}
+        )
+
+    async def test_invalid_cursor(self, authed_cli, theme_1):
+        resp = await authed_cli.get(
+            "/quiz.list_themes", params={"limit": 1, "cursor": "kek"}
+        )
+        assert resp.status == 400
+        data = await resp.json()
+        assert data["status"] == "bad_request"
+
     async def test_different_method(self, authed_cli):
         resp = await authed_cli.post("/quiz.list_themes")
         assert resp.status == 405
@@ -1,4 +1,6 @@
-from sqlalchemy import inspect
+from contextlib import contextmanager
+
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 
@@ -28,3 +30,33 @@ async def check_empty_table_exists(cli, tablename: str):
         tables = await conn.run_sync(use_inspector)
 
     assert tablename in tables
+
+
+@contextmanager
+def count_statements(cli, with_parameters: bool = False):
+    engine: AsyncEngine = cli.app.database._engine
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters) if with_parameters else statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def count_checkouts(cli):
+    engine: AsyncEngine = cli.app.database._engine
+    checkouts = []
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkouts.append(connection_record)
+
+    event.listen(engine.sync_engine.pool, "checkout", on_checkout)
+    try:
+        yield checkouts
+    finally:
+        event.remove(engine.sync_engine.pool, "checkout", on_checkout)